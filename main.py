@@ -1,22 +1,62 @@
-from modules import *
-from aiopubsub import Hub, Publisher, Subscriber, Key
+from modules import Broker, Trader, Supervisor, SnapshotStore, Journal
+from aiopubsub import Hub
+from utils import profiling
+from utils.log import setup_logging
+import argparse
 import asyncio
-import aiohttp
+import csv
 
 
+def load_watchlist(path: str = 'data/watchlist.csv') -> list:
+    with open(path, newline='') as f:
+        return [row[0].strip() for row in csv.reader(f) if row and row[0].strip()]
 
-while True:
+
+def arima_egarch():
+    # Imported on first use, on the trader's fitting thread, so statsmodels and arch stay out of start-up.
+    from modules import ARIMAEGARCHModel
+    return ARIMAEGARCHModel()
+
+
+async def main(workers: int = 0):
+    # Logging and the trade journal are written by background threads, off the event loop
+    listener = setup_logging(path='data/reports/bot.log')
+    journal = Journal('data/reports/journal').start()
+
+    # Create a Hub instance shared by all components
+    hub = Hub()
+    broker_api = "http://example.com/api"  # Replace with actual API URL
+    symbols = load_watchlist()
+
+    # The supervisor restarts any component that fails on its own, restoring its state
+    # from memory (or from the last snapshot after a full restart) instead of rewarming.
+    supervisor = Supervisor(SnapshotStore('data/snapshots/state.pkl'))
+    if workers:
+        # Sharded: each worker process owns a slice of the watchlist, the coordinator routes orders.
+        # Imported here, so running in one process does not load the runtime.
+        from modules import Coordinator
+        supervisor.add('coordinator', lambda: Coordinator(broker_api, symbols, workers, journal=journal, model_factory=arima_egarch))
+    else:
+        supervisor.add('broker', lambda: Broker(broker_api, hub, journal), run=lambda broker: broker.run(symbols))
+        # The trader owns each symbol's strategy, indicators and fitted model, so they are what gets snapshotted.
+        supervisor.add('trader', lambda: Trader(broker_api, hub, journal=journal, model_factory=arima_egarch))
+
+    # Timers are only recorded with PYTRADE_PROFILE=1; `kill -USR1 <pid>` takes a 10s sampling profile.
+    profiling.install_signal_trigger()
+    exporter = asyncio.create_task(profiling.export_periodically('data/reports/latency.json'))
+    try:
+        await supervisor.run()
+    finally:
+        exporter.cancel()
+        journal.stop()
+        listener.stop()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--workers', type=int, default=0,
+                        help='shard the watchlist across this many processes (0 runs everything in this process)')
     try:
-        # Create a Hub instance
-        hub = Hub()
-        
-        # Initialize the Broker and Trader with the Hub instance
-        broker_api = "http://example.com/api"  # Replace with actual API URL
-        broker = Broker(broker_api, hub)
-        trader = Trader(broker_api, hub)
-        
-        # Start the event loop to run the Broker and Trader
-        asyncio.run(hub.run())
-        
-    except Exception as e:
-        print(f"An error occurred: {e}")
\ No newline at end of file
+        asyncio.run(main(parser.parse_args().workers))
+    except KeyboardInterrupt:
+        pass
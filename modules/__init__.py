@@ -1,11 +1,61 @@
-from bots import __all__ as bots_all
-from broker import __all__ as broker_all
-from data import __all__ as data_all
-from indicators import __all__ as indicators_all
-from ml import __all__ as ml_all
-from risk import __all__ as risk_all
-from signal import __all__ as signal_all
-from strategy import __all__ as strategy_all
-data_all = getattr(__import__('data', fromlist=['__all__']), '__all__', [])
-
-__all__ = bots_all + broker_all + data_all + indicators_all + ml_all + risk_all + signal_all + strategy_all
+"""
+Top-level package for the trading bot.
+
+Subpackages are loaded on first attribute access rather than at import time, so
+`import modules` stays cheap. Heavy dependencies (pandas, statsmodels, arch, aiohttp)
+are only imported by the subpackage that needs them, when something asks for it.
+
+    from modules import Broker           # imports modules.broker only
+    from modules import ARIMAEGARCHModel  # imports modules.ml (statsmodels, arch)
+"""
+import importlib
+
+
+# Maps each exported name to the subpackage that defines it.
+_EXPORTS = {
+    'Scouter': 'bots',
+    'Supervisor': 'bots',
+    'Trader': 'bots',
+    'Broker': 'broker',
+    'Journal': 'data',
+    'SnapshotStore': 'data',
+    'RSI': 'indicators',
+    'VolatilityZScore': 'indicators',
+    'Bollinger': 'indicators',
+    'EMA': 'indicators',
+    'SMA': 'indicators',
+    'OBV': 'indicators',
+    'ARIMAEGARCHModel': 'ml',
+    'WindowDataset': 'ml',
+    'WindowRegression': 'ml',
+    'Coordinator': 'runtime',
+    'HashRing': 'runtime',
+    'ShardWorker': 'runtime',
+    'Trend': 'signal',
+    'Trade': 'signal',
+    'BollingerStrategy': 'strategy',
+}
+
+_SUBPACKAGES = ('bots', 'broker', 'data', 'indicators', 'ml', 'risk', 'runtime', 'signal', 'strategy')
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    """
+    Imports the subpackage owning `name` on first access and caches the result.
+    """
+    if name in _SUBPACKAGES:
+        return importlib.import_module(f'.{name}', __name__)
+
+    subpackage = _EXPORTS.get(name)
+    if subpackage is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(f'.{subpackage}', __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__) | set(_SUBPACKAGES))
@@ -1,4 +1,5 @@
-from scouter import Scouter
-from trader import Trader
+from .scouter import Scouter
+from .supervisor import Supervisor
+from .trader import Trader
 
-__all__ = ['Scouter', 'Trader']
\ No newline at end of file
+__all__ = ['Scouter', 'Supervisor', 'Trader']
@@ -0,0 +1,171 @@
+import asyncio
+import inspect
+import logging
+import time
+from typing import Any, Callable, Dict, Optional
+from ..data.snapshot import SnapshotStore
+
+
+logger = logging.getLogger(__name__)
+
+
+class Supervisor:
+    """
+    Runs bot components as independent asyncio tasks and keeps their state warm across failures.
+
+    Each component is registered with a factory that builds it. When a component's run()
+    raises, only that component is rebuilt; the others keep running. Before the replacement
+    starts, it is given the state of the instance it replaces, so positions and fitted model
+    parameters survive the restart instead of being reset and refitted.
+
+    State is also written to a SnapshotStore every `snapshot_interval` seconds, and on shutdown,
+    and restored from there on start-up, so a full process restart skips the refits too.
+    Periodic snapshots are pickled on the event loop, as state holds live references to objects
+    the loop keeps changing; only the file write happens on a worker thread.
+
+    Components may implement any of:
+        - async run(): the component's main loop. Components without one are just held.
+        - get_state() -> dict / set_state(dict): state to snapshot and restore.
+        - close(): called (and awaited, if async) before a failed instance is replaced.
+
+    @param store: Where snapshots are saved and loaded from.
+    @param snapshot_interval: Seconds between periodic snapshots.
+    @param restart_delay: Initial delay before restarting a failed component. Doubles on each
+    consecutive failure, up to `max_restart_delay`.
+    @param max_restart_delay: Upper bound for the restart delay. A component that ran for longer
+    than this before failing is considered healthy, and its delay is reset.
+    """
+    def __init__(
+            self,
+            store: SnapshotStore,
+            snapshot_interval: float = 30.0,
+            restart_delay: float = 1.0,
+            max_restart_delay: float = 60.0):
+        self.store = store
+        self.snapshot_interval = snapshot_interval
+        self.restart_delay = restart_delay
+        self.max_restart_delay = max_restart_delay
+        self.factories: Dict[str, Callable[[], Any]] = {}
+        self.runners: Dict[str, Optional[Callable[[Any], Any]]] = {}
+        self.instances: Dict[str, Any] = {}
+        self.state: Dict[str, dict] = {}
+
+    def add(self, name: str, factory: Callable[[], Any], run: Callable[[Any], Any] = None):
+        """
+        Registers a component.
+
+        @param name: Unique name, used as the component's key in snapshots.
+        @param factory: Builds a fresh instance of the component. Called inside the event loop.
+        @param run: Optional. Returns the coroutine to run for an instance, for components whose
+        run() needs arguments. Defaults to calling instance.run().
+        """
+        self.factories[name] = factory
+        self.runners[name] = run
+
+    def get(self, name: str) -> Any:
+        """
+        Returns the live instance of a component.
+        """
+        return self.instances[name]
+
+    def capture(self, name: str) -> None:
+        """
+        Copies a component's current state into the in-memory snapshot.
+        """
+        instance = self.instances.get(name)
+        if instance is not None and hasattr(instance, 'get_state'):
+            self.state[name] = instance.get_state()
+
+    def snapshot(self) -> None:
+        """
+        Captures every component's state and writes it to the store.
+        """
+        for name in self.instances:
+            self.capture(name)
+        self.store.save(self.state)
+
+    async def _start(self, name: str) -> Any:
+        instance = self.factories[name]()
+        if name in self.state and hasattr(instance, 'set_state'):
+            try:
+                instance.set_state(self.state[name])
+            except Exception as e:
+                # A stale or incompatible snapshot must not keep the component down: start it cold instead.
+                logger.warning("Discarding saved state of %s: %r", name, e, exc_info=e)
+                del self.state[name]
+                await self._close(name, instance)
+                instance = self.factories[name]()
+        self.instances[name] = instance
+        return instance
+
+    async def _close(self, name: str, instance: Any) -> None:
+        close = getattr(instance, 'close', None)
+        if close is None:
+            return
+        try:
+            result = close()
+            if inspect.isawaitable(result):
+                await result
+        except Exception as e:
+            logger.exception("Could not close %s: %r", name, e)
+
+    async def _supervise(self, name: str) -> None:
+        delay = self.restart_delay
+        while True:
+            started = time.monotonic()
+            try:
+                # Building the instance is inside the try, so a factory that fails on a restart
+                # is retried with backoff like any other failure instead of ending the supervisor.
+                instance = await self._start(name)
+                runner = self.runners[name]
+                if runner is not None:
+                    await runner(instance)
+                elif hasattr(instance, 'run'):
+                    await instance.run()
+                else:
+                    await asyncio.Future()
+                return
+            except asyncio.CancelledError:
+                await self._close(name, self.instances.get(name))
+                raise
+            except Exception as e:
+                # Keep whatever the failed instance had built up; it is a better starting point than nothing.
+                try:
+                    self.capture(name)
+                except Exception as capture_error:
+                    logger.exception("Could not capture state of %s: %s", name, capture_error)
+                await self._close(name, self.instances.pop(name, None))
+
+                if time.monotonic() - started > self.max_restart_delay:
+                    delay = self.restart_delay
+                logger.error("%s failed: %r. Restarting in %.1fs", name, e, delay, exc_info=e)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.max_restart_delay)
+
+    async def _snapshot_periodically(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.snapshot_interval)
+            try:
+                for name in list(self.instances):
+                    self.capture(name)
+                # Pickle on the loop, so nothing changes the state mid-pickle; writing the file can wait on a thread.
+                data = self.store.serialize(self.state)
+                await loop.run_in_executor(None, self.store.write, data)
+            except Exception as e:
+                logger.exception("Snapshot failed: %r", e)
+
+    async def run(self) -> None:
+        """
+        Restores the last snapshot, then runs all components until they finish or the task is cancelled.
+        """
+        self.state = self.store.load()
+        tasks = [asyncio.create_task(self._supervise(name), name=name) for name in self.factories]
+        snapshots = asyncio.create_task(self._snapshot_periodically())
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            snapshots.cancel()
+            for task in tasks:
+                task.cancel()
+            self.snapshot()
@@ -1,14 +1,161 @@
 import asyncio
+import logging
+from typing import Callable, Iterable
 from aiopubsub import Hub, Publisher, Subscriber, Key
-import aiohttp
+import pandas
+from ..data.journal import Journal
+from ..strategy.base.base import Strategy
+from ..strategy.base.bollingerStrategy import BollingerStrategy
+
+
+logger = logging.getLogger(__name__)
 
 
 class Trader:
-    def __init__(self, broker_api, hub: Hub):
+    """
+    Runs the strategies for every symbol the broker publishes data for, and publishes their
+    Confidence Index Vectors (CIVs) back to the broker.
+
+    One strategy is kept per symbol and given each new data window with update(), so its
+    position and the indicators it owns persist between updates. When a model factory is given,
+    a model is also fitted per symbol on its first window, off the event loop, and its one-step
+    volatility forecast is added to the CIV.
+
+    Strategies and fitted models are the trader's state: get_state() returns them for snapshots,
+    and set_state() holds them until each symbol's first update, where they are restored instead
+    of starting cold (and, for models, instead of refitting).
+
+    An update that fails is logged and skipped; the symbol's next update tries again.
+
+    Subscribes to ('trading', 'data_update', symbol) and publishes ('trading', 'civ_update').
+
+    @param broker_api: Base URL of the broker API.
+    @param hub: The hub shared with the Broker.
+    @param strategy_factory: Builds a strategy from (data, symbol=..., config=..., journal=...).
+    @param config: Passed to every strategy.
+    @param journal: Optional. Passed to every strategy to record its signals.
+    @param model_factory: Optional. Builds the model fitted per symbol, e.g. ARIMAEGARCHModel.
+    Called on a worker thread, so it may import its dependencies lazily.
+    @param fit_retry_delay: Seconds before a failed fit is retried, on the symbol's next update
+    after that. Doubles on each consecutive failure, up to `max_fit_retry_delay`.
+    @param max_fit_retry_delay: Upper bound for the retry delay.
+    """
+    def __init__(
+            self,
+            broker_api,
+            hub: Hub,
+            strategy_factory: Callable[..., Strategy] = BollingerStrategy,
+            config: dict = None,
+            journal: Journal = None,
+            model_factory: Callable = None,
+            fit_retry_delay: float = 60.0,
+            max_fit_retry_delay: float = 3600.0):
         self.broker_api = broker_api
         self.hub = hub
-        
-        #self.publisher = Publisher(hub, prefix=Key('trading'))
-        #self.subscriber = Subscriber(hub, prefix=Key('trading'))
-        #self.subscriber.add_async_listener(Key('civ_update'), self.on_civ_update)
-        
\ No newline at end of file
+        self.strategy_factory = strategy_factory
+        self.config = config if config else {}
+        self.journal = journal
+        self.model_factory = model_factory
+        self.fit_retry_delay = fit_retry_delay
+        self.max_fit_retry_delay = max_fit_retry_delay
+        self.strategies = {}
+        self.models = {}
+        self._saved_strategies = {}
+        self._saved_models = {}
+        self._fitting = {}
+        self._failed_fits = {} # symbol -> (consecutive failures, loop time of the next attempt)
+
+        self.publisher = Publisher(hub, prefix=Key('trading'))
+        self.subscriber = Subscriber(hub, 'trader')
+        self.subscriber.add_async_listener(Key('trading', 'data_update', '*'), self.on_data)
+
+    async def on_data(self, key: Key, data: pandas.DataFrame) -> None:
+        # aiopubsub drops a listener for good once it raises, so a failure must end with this update, not the trader.
+        try:
+            civ = await self.evaluate(key[-1], data)
+        except Exception as e:
+            logger.exception("Could not evaluate %s: %r", key[-1], e, extra={'symbol': key[-1]})
+            return
+        self.publisher.publish(Key('civ_update'), civ)
+
+    async def evaluate(self, symbol: str, data: pandas.DataFrame) -> dict:
+        """
+        Updates the symbol's strategy (and model) with a new data window and returns its CIV.
+        """
+        strategy = self.strategies.get(symbol)
+        if strategy is None:
+            strategy = self.strategy_factory(data, symbol=symbol, config=self.config, journal=self.journal)
+            if symbol in self._saved_strategies:
+                strategy.set_state(self._saved_strategies.pop(symbol))
+            self.strategies[symbol] = strategy
+        strategy.update(data)
+
+        civ = strategy.get_civ()
+        civ['symbol'] = symbol
+        if self.model_factory is not None:
+            model = await self._model(symbol, data)
+            if model is not None:
+                civ['volatility'] = float(model.forecast_volatility()[0])
+        return civ
+
+    async def _model(self, symbol: str, data: pandas.DataFrame):
+        if symbol in self.models:
+            return self.models[symbol]
+        loop = asyncio.get_running_loop()
+        failures, retry_at = self._failed_fits.get(symbol, (0, 0.0))
+        if loop.time() < retry_at:
+            return None
+        # Concurrent updates for a symbol share one fit.
+        if symbol not in self._fitting:
+            saved = self._saved_models.pop(symbol, None)
+            self._fitting[symbol] = loop.run_in_executor(None, self._build_model, saved, data['Close'])
+        try:
+            model = await asyncio.shield(self._fitting[symbol])
+        except Exception as e:
+            # Not cached: a fit can fail on an early, short window and succeed once more data has arrived.
+            delay = min(self.fit_retry_delay * 2 ** failures, self.max_fit_retry_delay)
+            self._failed_fits[symbol] = (failures + 1, loop.time() + delay)
+            logger.warning("Could not fit a model for %s: %r. Retrying in %.0fs", symbol, e, delay)
+            return None
+        finally:
+            self._fitting.pop(symbol, None)
+        self._failed_fits.pop(symbol, None)
+        self.models[symbol] = model
+        return model
+
+    def _build_model(self, saved: dict, close: pandas.Series):
+        model = self.model_factory()
+        if saved is not None:
+            model.set_state(saved)
+        else:
+            model.fit(close)
+        return model
+
+    def retain(self, symbols: Iterable[str]) -> None:
+        """
+        Drops the strategies and models of symbols that are no longer traded here.
+        """
+        keep = set(symbols)
+        self.strategies = {s: strategy for s, strategy in self.strategies.items() if s in keep}
+        self.models = {s: model for s, model in self.models.items() if s in keep}
+        self._failed_fits = {s: failed for s, failed in self._failed_fits.items() if s in keep}
+
+    async def close(self) -> None:
+        await self.subscriber.remove_all_listeners()
+
+    def get_state(self) -> dict:
+        """
+        Returns every symbol's strategy and model state, for snapshotting. State restored
+        for symbols that have not had an update yet is carried over.
+        """
+        return {
+            'strategies': {**self._saved_strategies, **{s: st.get_state() for s, st in self.strategies.items()}},
+            'models': {**self._saved_models, **{s: m.get_state() for s, m in self.models.items()}},
+        }
+
+    def set_state(self, state: dict) -> None:
+        """
+        Restores state previously returned by get_state(). Applied per symbol on its next update.
+        """
+        self._saved_strategies = dict(state.get('strategies', {}))
+        self._saved_models = dict(state.get('models', {}))
@@ -1,3 +1,3 @@
-from broker import Broker
+from .broker import Broker
 
 __all__ = ['Broker']
\ No newline at end of file
@@ -1,36 +1,60 @@
 import asyncio
+import logging
 from aiopubsub import Hub, Publisher, Subscriber, Key
 import aiohttp
+from utils.profiling import count, timed
+from ..data.journal import Journal
 
 
+logger = logging.getLogger(__name__)
+
 
 class Broker:
-    def __init__(self, broker_api, hub: Hub):
+    def __init__(self, broker_api, hub: Hub, journal: Journal = None, route_orders: bool = True):
         self.broker_api = broker_api
         self.hub = hub
+        self.journal = journal # Optional record of submitted orders and their outcome
         self.publisher = Publisher(hub, prefix=Key('trading'))
-        self.subscriber = Subscriber(hub, prefix=Key('trading'))
-        self.subscriber.add_async_listener(Key('civ_update'), self.on_civ_update)
+        self.subscriber = Subscriber(hub, 'broker')
+        # Without order routing the broker only fetches and publishes data, e.g. in a shard worker
+        # whose CIVs are routed by the coordinator's broker instead.
+        if route_orders:
+            self.subscriber.add_async_listener(Key('trading', 'civ_update'), self._on_civ_message)
+
+        self.risk_threshold = 0.75 # Risk threshold for the broker
+        self.portfolio = {} # Portfolio dictionary to store asset positions
 
-        # self.risk_threshold = 0.75 # Risk threshold for the broker
-        # self.portfolio = {} # Portfolio dictionary to store asset positions
+    async def _on_civ_message(self, key: Key, civ_data):
+        await self.on_civ_update(civ_data)
 
     async def on_civ_update(self, civ_data):
         # Temp idea function. civ_data represents Confidence Index Vector/Value.
-        print("Received CIV data:", civ_data)
+        logger.debug("Received CIV data: %s", civ_data)
         order = self.evaluate_civ(civ_data)
-        if order:
+        if not order:
+            return
+        # Failures end with this order. Raising would drop the hub's listener for good, ending order routing.
+        try:
             await self.place_order(order)
+        except Exception as e:
+            count('broker.orders_failed')
+            logger.error("Could not place order %s: %r", order, e, extra={'order': order})
             
+    @timed
     async def place_order(self, order):
         # Use aiohttp for non-blocking HTTP POST requests to commit the trade order.
         async with aiohttp.ClientSession() as session:
-            async with session.post(self.broker_api_url, json=order) as response:
+            async with session.post(self.broker_api, json=order) as response:
                 if response.status == 200:
-                    print("Order placed successfully:", order)
+                    count('broker.orders_placed')
+                    logger.info("Order placed successfully: %s", order, extra={'order': order})
                 else:
-                    print("Failed to place order:", order)
+                    count('broker.orders_failed')
+                    logger.warning("Failed to place order (HTTP %s): %s", response.status, order, extra={'order': order})
+                if self.journal is not None:
+                    self.journal.record('order', status=response.status, **order)
 
+    @timed
     async def update_data(self, symbol: str, session: aiohttp.ClientSession = None):
         """
         Fetch data for a given symbol, convert the result into a Pandas DataFrame,
@@ -50,16 +74,20 @@ class Broker:
                         # Stuff
                         pass
                     except Exception as e:
-                        print(f"Error processing data for {symbol}: {e}")
+                        count('broker.fetches_failed')
+                        logger.error("Error processing data for %s: %s", symbol, e)
                         return
                     # Publish the new data for the symbol; subscribers on the specific key receive the DataFrame.
                     update_key = Key('data_update', symbol)
-                    await self.publisher.publish(update_key, df)
-                    print(f"Published updated data for {symbol}")
+                    self.publisher.publish(update_key, df)
+                    count('broker.fetches')
+                    logger.debug("Published updated data for %s", symbol)
                 else:
-                    print(f"Failed to fetch data for {symbol} (HTTP {response.status})")
+                    count('broker.fetches_failed')
+                    logger.warning("Failed to fetch data for %s (HTTP %s)", symbol, response.status)
         except Exception as e:
-            print(f"Exception fetching data for {symbol}: {e}")
+            count('broker.fetches_failed')
+            logger.error("Exception fetching data for %s: %s", symbol, e)
         finally:
             if close_session:
                 await session.close()
@@ -73,10 +101,38 @@ class Broker:
             tasks = [self.update_data(symbol, session) for symbol in symbols]
             await asyncio.gather(*tasks)
 
+    async def run(self, symbols: list, interval: float = 60.0):
+        """
+        Refreshes data for the given symbols every `interval` seconds until cancelled.
+        """
+        while True:
+            await self.update_all(symbols)
+            await asyncio.sleep(interval)
+
+    async def close(self):
+        """
+        Detaches the broker from the hub, so a replacement instance can subscribe in its place.
+        """
+        await self.subscriber.remove_all_listeners()
+
+    def get_state(self) -> dict:
+        """
+        Returns the positions held by the broker, for snapshotting. Data windows are not kept:
+        every refresh fetches the full window again, so a restored one would be replaced at once.
+        """
+        return {'portfolio': self.portfolio}
+
+    def set_state(self, state: dict) -> None:
+        """
+        Restores state previously returned by get_state().
+        """
+        self.portfolio = state.get('portfolio', {})
+
     def evaluate_civ(self, civ_data):
         # Evaluate the CIV data and decide whether to place an order
+        symbol = civ_data.get('symbol')
         if civ_data.get('BUY', 0) > self.risk_threshold:
-            return {"symbol": "AAPL", "action": "BUY", "amount": 10}
+            return {"symbol": symbol, "action": "BUY", "amount": 10}
         elif civ_data.get('SELL', 0) > self.risk_threshold:
-            return {"symbol": "AAPL", "action": "SELL", "amount": 10}
+            return {"symbol": symbol, "action": "SELL", "amount": 10}
         return None
\ No newline at end of file
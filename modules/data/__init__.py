@@ -1,5 +1,7 @@
-
+from .journal import Journal
+from .snapshot import SnapshotStore
 
 __all__ = [
-    
-]
\ No newline at end of file
+    'Journal',
+    'SnapshotStore'
+]
@@ -0,0 +1,177 @@
+import glob
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from typing import Iterator, Optional
+
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class Journal:
+    """
+    Append-only record of signals, orders and fills, written off the event loop.
+
+    record() only puts a dictionary on a queue, so it is safe to call from the asyncio loop
+    on every tick. A background thread drains the queue in batches and appends them as compact
+    JSON lines to the current journal file, which is rotated once it grows past `max_bytes`.
+
+    Files are named after the time of their first record (journal-<epoch ms>.jsonl), so replay()
+    can skip whole files that end before the requested start time.
+
+    A batch that cannot be written (disk full, permissions) is logged and counted in `dropped`,
+    and the writer carries on with a fresh file for the next batch, so one failed write does not
+    silently stop the journal.
+
+    @param directory: Where journal files are written.
+    @param max_bytes: Size after which a new file is started.
+    @param batch_size: Maximum number of records written per batch.
+    @param flush_interval: Maximum seconds a record waits in the queue before being written.
+    """
+    def __init__(
+            self,
+            directory: str = 'data/reports/journal',
+            max_bytes: int = 16 * 1024 * 1024,
+            batch_size: int = 512,
+            flush_interval: float = 0.5):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self._file = None
+        self.dropped = 0
+
+    def start(self) -> 'Journal':
+        os.makedirs(self.directory, exist_ok=True)
+        self._thread = threading.Thread(target=self._write_loop, name='journal-writer', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """
+        Writes any queued records and stops the writer thread.
+        """
+        if self._thread is None:
+            return
+        self._queue.put(_STOP)
+        self._thread.join()
+        self._thread = None
+        if self.dropped:
+            logger.error("%d journal records could not be written to %s", self.dropped, self.directory)
+
+    def __enter__(self) -> 'Journal':
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def record(self, kind: str, **fields) -> None:
+        """
+        Queues a record for writing. Never blocks.
+
+        @param kind: The record type, e.g. 'signal', 'order' or 'fill'.
+        @param fields: JSON-serialisable values describing the event. Non-serialisable
+        values (enums, timestamps) are written as strings.
+        """
+        fields['kind'] = kind
+        fields.setdefault('ts', time.time())
+        self._queue.put(fields)
+
+    def _write_loop(self) -> None:
+        stopping = False
+        while not stopping:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            if batch[-1] is _STOP:
+                batch.pop()
+                stopping = True
+            if batch:
+                try:
+                    self._write(batch)
+                except Exception as e:
+                    self.dropped += len(batch)
+                    logger.exception("Could not write %d journal records: %r", len(batch), e)
+                    self._close_file()
+        self._close_file()
+
+    def _close_file(self) -> None:
+        if self._file is None:
+            return
+        try:
+            self._file.close()
+        except OSError:
+            # Every batch is flushed as it is written, so there is nothing left to lose here.
+            pass
+        self._file = None
+
+    def _write(self, batch: list) -> None:
+        if self._file is None or self._file.tell() >= self.max_bytes:
+            if self._file is not None:
+                self._file.close()
+            name = f"journal-{int(batch[0]['ts'] * 1000):013d}.jsonl"
+            self._file = open(os.path.join(self.directory, name), 'a', encoding='utf-8')
+        self._file.write(''.join(json.dumps(r, separators=(',', ':'), default=str) + '\n' for r in batch))
+        self._file.flush()
+
+    def files(self) -> list:
+        """
+        Returns the journal files, oldest first.
+        """
+        return sorted(glob.glob(os.path.join(self.directory, 'journal-*.jsonl')))
+
+    def replay(self, kind: str = None, symbol: str = None, since: float = None, until: float = None) -> Iterator[dict]:
+        """
+        Yields past records in the order they were written, optionally filtered.
+
+        @param kind: Only records of this type.
+        @param symbol: Only records for this symbol.
+        @param since: Only records at or after this epoch time.
+        @param until: Only records before this epoch time.
+        """
+        files = self.files()
+        starts = [int(os.path.basename(f)[8:-6]) / 1000 for f in files]
+        # Cheap substring checks, so non-matching lines are skipped without being parsed.
+        needles = []
+        if kind is not None:
+            needles.append(json.dumps({'kind': kind}, separators=(',', ':'))[1:-1])
+        if symbol is not None:
+            needles.append(json.dumps({'symbol': symbol}, separators=(',', ':'))[1:-1])
+
+        for i, path in enumerate(files):
+            if since is not None and i + 1 < len(files) and starts[i + 1] < since:
+                continue
+            if until is not None and starts[i] >= until:
+                break
+            with open(path, encoding='utf-8') as f:
+                for line in f:
+                    if not all(needle in line for needle in needles):
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # A torn final line from a crash mid-write.
+                        continue
+                    if kind is not None and record.get('kind') != kind:
+                        continue
+                    if symbol is not None and record.get('symbol') != symbol:
+                        continue
+                    if since is not None and record['ts'] < since:
+                        continue
+                    if until is not None and record['ts'] >= until:
+                        continue
+                    yield record
@@ -0,0 +1,68 @@
+import logging
+import os
+import pickle
+import tempfile
+from typing import Any, Dict
+
+
+logger = logging.getLogger(__name__)
+
+
+class SnapshotStore:
+    """
+    Local file store for the in-memory state of running components.
+
+    State is a dictionary of component name -> state dictionary, as returned by each
+    component's get_state(). It is pickled with the highest protocol, which keeps pandas
+    and numpy objects compact and makes loading a matter of milliseconds.
+    Writes go to a temporary file that replaces the snapshot atomically, so a crash
+    mid-write never leaves a truncated snapshot behind.
+
+    @param path: The snapshot file. Parent directories are created on first save.
+    """
+    def __init__(self, path: str = 'data/snapshots/state.pkl'):
+        self.path = path
+
+    def save(self, state: Dict[str, Any]) -> None:
+        """
+        Atomically writes the state to the snapshot file.
+        """
+        self.write(self.serialize(state))
+
+    @staticmethod
+    def serialize(state: Dict[str, Any]) -> bytes:
+        """
+        Pickles the state. Must run on the thread that owns the objects in it, as state holds
+        live references (data windows, indicators) that are not safe to read while they change.
+        """
+        return pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def write(self, data: bytes) -> None:
+        """
+        Atomically writes state serialized by serialize() to the snapshot file. Safe to call from any thread.
+        """
+        directory = os.path.dirname(self.path) or '.'
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def load(self) -> Dict[str, Any]:
+        """
+        Returns the last saved state, or an empty dictionary if there is no usable snapshot.
+        """
+        try:
+            with open(self.path, 'rb') as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            # Beyond truncation, a snapshot can fail in any way while its objects are rebuilt
+            # (e.g. a DataFrame pickled mid-change); none of them should keep the bot from starting.
+            logger.warning("Ignoring unreadable snapshot %s: %s", self.path, e)
+            return {}
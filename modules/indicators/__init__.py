@@ -1,5 +1,5 @@
-from literal_ import *
-from series_ import *
+from .literal_ import *
+from .series_ import *
 
 __all__ = [
     'RSI',
@@ -15,6 +15,18 @@ class SeriesIndicator(ABC):
         """
         pass
 
+    def get_state(self) -> dict:
+        """
+        Returns the running state of the indicator (data window and calculated values) for snapshotting.
+        """
+        return self.__dict__.copy()
+
+    def set_state(self, state: dict) -> None:
+        """
+        Restores state previously returned by get_state().
+        """
+        self.__dict__.update(state)
+
 class LiteralIndicator(ABC):
     def __init__(self, data: pandas.DataFrame):
         self.data = data
@@ -24,4 +36,16 @@ class LiteralIndicator(ABC):
         """
         Adds the calculated field to the dataframe parsed to the class.
         """
-        pass
\ No newline at end of file
+        pass
+
+    def get_state(self) -> dict:
+        """
+        Returns the running state of the indicator (data window and calculated values) for snapshotting.
+        """
+        return self.__dict__.copy()
+
+    def set_state(self, state: dict) -> None:
+        """
+        Restores state previously returned by get_state().
+        """
+        self.__dict__.update(state)
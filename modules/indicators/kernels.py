@@ -0,0 +1,364 @@
+"""
+Compute kernels for indicator primitives, with a selectable backend.
+
+Each kernel takes 1-D float arrays and writes its result into `out` (allocated if not given),
+without building intermediate pandas objects. Results match the pandas expressions they replace:
+
+    rolling_mean(x, w)   x.rolling(w).mean()
+    rolling_std(x, w)    x.rolling(w).std()
+    ewm_mean(x, alpha)   x.ewm(alpha=alpha, adjust=False).mean()
+    wilder(x, n)         x.ewm(alpha=1 / n, adjust=False).mean()
+    obv(close, volume)   OBV.calculate() before kernels were introduced
+
+Backends:
+    - 'numpy': vectorised NumPy. The default. Rolling windows cost O(n) whatever their length,
+      using prefix sums over chunks of the series.
+    - 'numba': JIT-compiled loops, O(n) like the NumPy kernels. Requires numba; compiled on first selection.
+    - 'pandas': the original pandas expressions, kept as a reference and fallback.
+
+The backend is chosen with set_backend(), or the PYTRADE_BACKEND environment variable.
+"""
+import itertools
+import os
+import numpy as np
+import pandas
+
+
+BACKENDS = ('numpy', 'numba', 'pandas')
+
+# Windows whose rolling sums are computed from one set of prefix sums. Each chunk is shifted by its
+# own mean first, which keeps the prefix sums small and the rounding error of subtracting them low.
+_CHUNK = 4096
+
+
+# --- NumPy ---
+
+def _window_sums(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    Returns the sum of every complete window, len(values) - window + 1 of them, from prefix sums.
+    """
+    prefix = np.empty(len(values) + 1)
+    prefix[0] = 0.0
+    np.cumsum(values, out=prefix[1:])
+    return prefix[window:] - prefix[:-window]
+
+
+def _np_rolling(x: np.ndarray, window: int, out: np.ndarray, reduce) -> np.ndarray:
+    # O(n) regardless of the window: reduce() turns the values of _CHUNK consecutive windows
+    # into their results with a few passes of prefix sums.
+    n = len(x)
+    out[:min(window - 1, n)] = np.nan
+    if n < window:
+        return out
+    missing = np.isnan(x)
+    gaps = missing.any()
+    if gaps:
+        x = np.where(missing, 0.0, x)
+    result = out[window - 1:]
+    for start in range(0, len(result), _CHUNK):
+        stop = min(start + _CHUNK, len(result))
+        reduce(x[start:stop + window - 1], window, result[start:stop])
+    if gaps:
+        # Any window containing a NaN is NaN, as with pandas' default min_periods.
+        result[_window_sums(missing, window) > 0] = np.nan
+    return out
+
+
+def _mean_chunk(values, window, result):
+    shift = values.mean()
+    np.divide(_window_sums(values - shift, window), window, out=result)
+    result += shift
+
+
+def _std_chunk(values, window, result):
+    shifted = values - values.mean()
+    total = _window_sums(shifted, window)
+    np.square(shifted, out=shifted)
+    np.subtract(_window_sums(shifted, window), total * total / window, out=result)
+    np.maximum(result, 0.0, out=result)
+    result /= window - 1
+    np.sqrt(result, out=result)
+
+
+def _np_rolling_mean(x, window, out):
+    return _np_rolling(x, window, out, _mean_chunk)
+
+
+def _np_rolling_std(x, window, out):
+    if window == 1:
+        # pandas defines the sample std of a single value as NaN
+        out[:] = np.nan
+        return out
+    return _np_rolling(x, window, out, _std_chunk)
+
+
+def _ewm_loop(x, alpha, out):
+    # Mirrors pandas' adjust=False, ignore_na=False recursion, including NaN gaps.
+    beta = 1.0 - alpha
+    weighted = np.nan
+    old_wt = 1.0
+    for i in range(len(x)):
+        cur = x[i]
+        is_observation = cur == cur
+        if weighted == weighted:
+            old_wt *= beta
+            if is_observation:
+                weighted = (old_wt * weighted + alpha * cur) / (old_wt + alpha)
+                old_wt = 1.0
+        elif is_observation:
+            weighted = cur
+        out[i] = weighted
+    return out
+
+
+def _np_ewm_mean(x, alpha, out):
+    n = len(x)
+    beta = 1.0 - alpha
+    if n == 0:
+        return out
+    if np.isnan(x).any() or beta <= 0.0:
+        return _ewm_loop(x, alpha, out)
+
+    # Closed form within blocks: y[s+j] = beta^(j+1) * y[s-1] + alpha * beta^j * sum_k(beta^-k * x[s+k]).
+    # Blocks are sized so beta^-block stays below 1e4, keeping the rounding error around 1e-12.
+    # Every block is first solved from a zero start in one vectorised pass; only the carry
+    # between blocks, one scalar per block, is propagated sequentially.
+    block = min(n, max(1, int(np.log(1e4) / -np.log(beta))))
+    powers = beta ** np.arange(block + 1)
+    n_blocks = -(-n // block)
+    full = (n // block) * block
+
+    blocks = out[:full].reshape(-1, block)
+    np.multiply(x[:full].reshape(-1, block), 1.0 / powers[:block], out=blocks)
+    np.cumsum(blocks, axis=1, out=blocks)
+    blocks *= alpha * powers[:block]
+    tail = out[full:]
+    if len(tail):
+        np.multiply(x[full:], 1.0 / powers[:len(tail)], out=tail)
+        np.cumsum(tail, out=tail)
+        tail *= alpha * powers[:len(tail)]
+
+    local_last = out[np.minimum(np.arange(1, n_blocks + 1) * block, n) - 1]
+    decay = powers[block]
+    starts = np.fromiter(
+        itertools.accumulate(local_last[:-1], lambda start, last: last + decay * start, initial=x[0]),
+        dtype=np.float64, count=n_blocks)
+    blocks += np.multiply.outer(starts[:len(blocks)], powers[1:])
+    if len(tail):
+        tail += starts[-1] * powers[1:len(tail) + 1]
+    return out
+
+
+def _np_obv(close, volume, out):
+    if len(close) == 0:
+        return out
+    diff = np.diff(close)
+    # +1 on up closes, -1 on down closes, 0 when unchanged or either close is NaN
+    direction = (diff > 0).view(np.int8) - (diff < 0).view(np.int8)
+    out[0] = 0
+    np.multiply(direction, volume[1:], out=out[1:], casting='unsafe')
+    return np.cumsum(out, out=out)
+
+
+# --- Numba ---
+
+def _loop_rolling(x, window, out, std):
+    # Running sums, added to and removed from as the window slides. They are rebuilt from scratch,
+    # shifted by the chunk's first value, every _CHUNK windows so rounding errors cannot accumulate.
+    n = len(x)
+    for i in range(min(window - 1, n)):
+        out[i] = np.nan
+    for start in range(0, n - window + 1, _CHUNK):
+        stop = min(start + _CHUNK, n - window + 1)
+        shift = x[start] if x[start] == x[start] else 0.0
+        total = 0.0
+        squares = 0.0
+        nans = 0
+        for j in range(start, start + window - 1):
+            if x[j] == x[j]:
+                total += x[j] - shift
+                squares += (x[j] - shift) ** 2
+            else:
+                nans += 1
+        for i in range(start, stop):
+            end = i + window - 1
+            if x[end] == x[end]:
+                total += x[end] - shift
+                squares += (x[end] - shift) ** 2
+            else:
+                nans += 1
+            if nans > 0 or (std and window < 2):
+                out[end] = np.nan
+            elif std:
+                out[end] = np.sqrt(max(squares - total * total / window, 0.0) / (window - 1))
+            else:
+                out[end] = shift + total / window
+            if x[i] == x[i]:
+                total -= x[i] - shift
+                squares -= (x[i] - shift) ** 2
+            else:
+                nans -= 1
+    return out
+
+
+def _loop_obv(close, volume, out):
+    if len(close) == 0:
+        return out
+    out[0] = 0
+    for i in range(1, len(close)):
+        if close[i] > close[i - 1]:
+            out[i] = out[i - 1] + volume[i]
+        elif close[i] < close[i - 1]:
+            out[i] = out[i - 1] - volume[i]
+        else:
+            out[i] = out[i - 1]
+    return out
+
+
+def _compile_numba() -> dict:
+    try:
+        import numba
+    except ImportError as e:
+        raise ImportError("The 'numba' backend requires numba to be installed.") from e
+    jit = numba.njit(cache=True, nogil=True)
+    rolling = jit(_loop_rolling)
+    return {
+        'rolling_mean': lambda x, window, out: rolling(x, window, out, False),
+        'rolling_std': lambda x, window, out: rolling(x, window, out, True),
+        'ewm_mean': jit(_ewm_loop),
+        'obv': jit(_loop_obv),
+    }
+
+
+# --- pandas ---
+
+def _pd_rolling_mean(x, window, out):
+    out[:] = pandas.Series(x).rolling(window=window).mean().to_numpy()
+    return out
+
+
+def _pd_rolling_std(x, window, out):
+    out[:] = pandas.Series(x).rolling(window=window).std().to_numpy()
+    return out
+
+
+def _pd_ewm_mean(x, alpha, out):
+    out[:] = pandas.Series(x).ewm(alpha=alpha, adjust=False).mean().to_numpy()
+    return out
+
+
+def _pd_obv(close, volume, out):
+    close = pandas.Series(close)
+    out[:] = np.where(
+        close > close.shift(1), volume,
+        np.where(close < close.shift(1), -volume, 0)
+    ).cumsum()
+    return out
+
+
+_NUMPY = {
+    'rolling_mean': _np_rolling_mean,
+    'rolling_std': _np_rolling_std,
+    'ewm_mean': _np_ewm_mean,
+    'obv': _np_obv,
+}
+
+_PANDAS = {
+    'rolling_mean': _pd_rolling_mean,
+    'rolling_std': _pd_rolling_std,
+    'ewm_mean': _pd_ewm_mean,
+    'obv': _pd_obv,
+}
+
+_kernels = {'numpy': _NUMPY, 'pandas': _PANDAS}
+_backend = 'numpy'
+_active = _NUMPY
+
+
+def set_backend(name: str) -> None:
+    """
+    Selects the backend used by all kernels.
+
+    @param name: One of BACKENDS.
+    @raises ValueError: If the backend is unknown.
+    @raises ImportError: If 'numba' is requested but not installed.
+    """
+    global _backend, _active
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown backend {name!r}. Expected one of {BACKENDS}.")
+    if name not in _kernels:
+        _kernels[name] = _compile_numba()
+    _backend, _active = name, _kernels[name]
+
+
+def get_backend() -> str:
+    return _backend
+
+
+def available_backends() -> list:
+    """
+    Returns the backends that can be selected in this environment.
+    """
+    try:
+        import numba  # noqa: F401
+    except ImportError:
+        return ['numpy', 'pandas']
+    return list(BACKENDS)
+
+
+def _as_float(x) -> np.ndarray:
+    return np.ascontiguousarray(x, dtype=np.float64)
+
+
+def _output(x: np.ndarray, out: np.ndarray, dtype=np.float64) -> np.ndarray:
+    if out is None:
+        return np.empty(len(x), dtype=dtype)
+    if len(out) != len(x):
+        raise ValueError(f"Output has length {len(out)}, expected {len(x)}.")
+    return out
+
+
+def rolling_mean(x, window: int, out: np.ndarray = None) -> np.ndarray:
+    """
+    Rolling mean over `window` values. The first window - 1 values, and any window containing NaN, are NaN.
+    """
+    x = _as_float(x)
+    return _active['rolling_mean'](x, window, _output(x, out))
+
+
+def rolling_std(x, window: int, out: np.ndarray = None) -> np.ndarray:
+    """
+    Rolling sample standard deviation (ddof=1) over `window` values. NaN handling as rolling_mean().
+    """
+    x = _as_float(x)
+    return _active['rolling_std'](x, window, _output(x, out))
+
+
+def ewm_mean(x, alpha: float, out: np.ndarray = None) -> np.ndarray:
+    """
+    Exponentially weighted mean with smoothing factor `alpha`, without adjustment.
+    For a span, alpha = 2 / (span + 1).
+    """
+    x = _as_float(x)
+    return _active['ewm_mean'](x, float(alpha), _output(x, out))
+
+
+def wilder(x, period: int, out: np.ndarray = None) -> np.ndarray:
+    """
+    Wilder's smoothing (RMA), as used by RSI and ATR: an EWM with alpha = 1 / period.
+    """
+    return ewm_mean(x, 1.0 / period, out)
+
+
+def obv(close, volume, out: np.ndarray = None) -> np.ndarray:
+    """
+    On-Balance Volume: the running sum of volume, added on up closes and subtracted on down closes.
+    The output keeps the dtype of `volume` unless `out` is given.
+    """
+    close = _as_float(close)
+    volume = np.ascontiguousarray(volume)
+    return _active['obv'](close, volume, _output(close, out, volume.dtype))
+
+
+if 'PYTRADE_BACKEND' in os.environ:
+    set_backend(os.environ['PYTRADE_BACKEND'])
@@ -1,5 +1,5 @@
-from rsi import RSI
-from zscore import VolatilityZScore
+from .rsi import RSI
+from .zscore import VolatilityZScore
 
 __all__ = [
     'RSI',
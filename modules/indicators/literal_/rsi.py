@@ -1,5 +1,8 @@
 from ..base import LiteralIndicator
+from ..kernels import wilder
+import numpy as np
 import pandas
+from utils.profiling import timed
 
 
 class RSI(LiteralIndicator):
@@ -10,11 +13,15 @@ class RSI(LiteralIndicator):
     @param period: The number of periods to use for the RSI calculation. Default is 14.
     The time period is ignorant of time units, and instead uses rows. 
     When instantiating the class, it may be best to calculate the rows before the class is instantiated.
+    @param smoothing: How gains and losses are averaged. 'simple' averages the first `period` rows (default).
+    'wilder' applies Wilder's smoothing over the whole series, as in the standard RSI definition.
     """
-    def __init__(self, data: pandas.DataFrame, period: int = 14):
+    def __init__(self, data: pandas.DataFrame, period: int = 14, smoothing: str = 'simple'):
         super().__init__(data)
         self.period = period
+        self.smoothing = smoothing
 
+    @timed
     def calculate(self) -> int:
         """
         Calculates the RSI indicator for a given dataframe. 
@@ -29,9 +36,16 @@ class RSI(LiteralIndicator):
         RS = average gain / average loss
         RSI = 100 - (100 / (1 + RS))
         """
-        df = self.data[:self.period].copy()
-        avg_gain = df['close'].diff().where(df['close'].diff() > 0, 0).mean()
-        avg_loss = df['close'].diff().where(df['close'].diff() < 0, 0).mean()
+        if self.smoothing == 'wilder':
+            diff = np.diff(self.data['close'].to_numpy(dtype=float))
+            avg_gain = wilder(np.maximum(diff, 0), self.period)[-1]
+            avg_loss = -wilder(np.maximum(-diff, 0), self.period)[-1]
+        else:
+            close = self.data['close'].to_numpy(dtype=float)[:self.period]
+            # The leading row has no change, but still counts towards the average
+            diff = np.diff(close)
+            avg_gain = diff[diff > 0].sum() / len(close)
+            avg_loss = diff[diff < 0].sum() / len(close)
         rs = avg_gain / abs(avg_loss) if avg_loss != 0 else 0
         rsi = 100 - (100 / (1 + rs))
         # Set self.rsi for later calling
@@ -1,6 +1,8 @@
-from base import LiteralIndicator
+from ..base import LiteralIndicator
 from ..series_.bollinger import Bollinger
+from ..kernels import rolling_mean, rolling_std
 import pandas
+from utils.profiling import timed
 
 
 class VolatilityZScore(LiteralIndicator):
@@ -28,6 +30,7 @@ class VolatilityZScore(LiteralIndicator):
         self.sma_interval: int = sma_interval
         self.z_score: float = None
 
+    @timed
     def calculate(self) -> float:
         """
         Calculates the Z-Score of the volatility of the Bollinger Bands.
@@ -37,14 +40,15 @@ class VolatilityZScore(LiteralIndicator):
             self.bollinger.calculate()
             self.data = self.bollinger.data.copy()
 
-        band_width = self.data['Upper Band'] - self.data['Lower Band']
+        middle = self.data['Middle Band'].to_numpy(dtype=float)
+        band_width = self.data['Upper Band'].to_numpy(dtype=float) - self.data['Lower Band'].to_numpy(dtype=float)
 
         if self.sma_interval is None:
-            noise_score = band_width / self.data['Middle Band']
+            noise_score = band_width / middle
         else:
-            noise_score = band_width / self.data['Middle Band'].rolling(window=self.sma_interval).mean()
-        
-        z_score = (noise_score - noise_score.rolling(window=self.period).mean()) / noise_score.rolling(window=self.period).std()
-        self.z_score = z_score.iloc[-1]
+            noise_score = band_width / rolling_mean(middle, self.sma_interval)
 
-        return z_score.iloc[-1]
+        z_score = (noise_score - rolling_mean(noise_score, self.period)) / rolling_std(noise_score, self.period)
+        self.z_score = z_score[-1]
+
+        return z_score[-1]
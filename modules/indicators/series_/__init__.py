@@ -1,6 +1,6 @@
-from bollinger import Bollinger
-from ma import SMA, EMA
-from obv import OBV
+from .bollinger import Bollinger
+from .ma import SMA, EMA
+from .obv import OBV
 
 __all__ = [
     'Bollinger',
@@ -1,5 +1,8 @@
 from ..base import SeriesIndicator
+from ..kernels import rolling_mean, rolling_std
+import numpy as np
 import pandas
+from utils.profiling import timed
 
 
 class Bollinger(SeriesIndicator):
@@ -23,13 +26,18 @@ class Bollinger(SeriesIndicator):
         self.mult = mult
         self.current_volatility = None
 
+    @timed
     def calculate(self) -> pandas.DataFrame:
         """
         Adds the calculated field to the dataframe parsed to the class.
         """
-        self.data['Middle Band'] = self.data['Close'].rolling(window=self.period).mean()
-        self.data['Upper Band'] = self.data['Middle Band'] + (self.data['Close'].rolling(window=self.period).std() * self.mult)
-        self.data['Lower Band'] = self.data['Middle Band'] - (self.data['Close'].rolling(window=self.period).std() * self.mult)
+        close = self.data['Close'].to_numpy(dtype=float)
+        middle = rolling_mean(close, self.period)
+        width = rolling_std(close, self.period)
+        width *= self.mult
+        self.data['Middle Band'] = middle
+        self.data['Upper Band'] = middle + width
+        self.data['Lower Band'] = middle - width
         self.current_volatility = self.data['Upper Band'].iloc[-1] - self.data['Lower Band'].iloc[-1]
         return self.data
     
@@ -44,6 +52,6 @@ class Bollinger(SeriesIndicator):
         Returns True if the Bollinger Bands are squeezed, False otherwise.
         A squeeze is defined as the current volatility being below the specified quantile of the rolling volatility.
         """
-        rolling_volatility = self.data['Upper Band'].rolling(window=window).std()
-        return self.current_volatility < rolling_volatility.quantile(quantile)
+        rolling_volatility = rolling_std(self.data['Upper Band'].to_numpy(dtype=float), window)
+        return self.current_volatility < np.nanquantile(rolling_volatility, quantile)
     
\ No newline at end of file
@@ -1,7 +1,9 @@
 from ..base import SeriesIndicator
+from ..kernels import rolling_mean, ewm_mean
 from ...signal.trend import Trend
 import yaml
 import pandas
+from utils.profiling import timed
 
 
 
@@ -19,11 +21,12 @@ class SMA(SeriesIndicator):
         self.str_down = self.config.get('strong_down_threshold', -0.2)
         self.down = self.config.get('down_threshold', -0.05)
 
+    @timed
     def calculate(self):
         """
         Adds the calculated field to the dataframe parsed to the class.
         """
-        self.data[f'SMA_{self.period}'] = self.data['Close'].rolling(window=self.period).mean()
+        self.data[f'SMA_{self.period}'] = rolling_mean(self.data['Close'].to_numpy(dtype=float), self.period)
         return self.data
     
     def get_sma(self) -> pandas.Series:
@@ -73,15 +76,16 @@ class EMA(SeriesIndicator):
         self.period = period
         self.config = config if config else {}
 
+    @timed
     def calculate(self, adjust: bool = False) -> pandas.DataFrame:
         """
         Adds the Exponential Moving Average (EMA) to the dataframe parsed to the class.
 
         @param adjust: If True, the EMA's weights are calculated using the full history (less efficient). Default is False.
         """
-        self.data[f'EMA_{self.period}'] = self.data['Close'].ewm(
-            span=self.period, 
-            adjust=adjust
-            ).mean()
+        if adjust:
+            self.data[f'EMA_{self.period}'] = self.data['Close'].ewm(span=self.period, adjust=True).mean()
+        else:
+            self.data[f'EMA_{self.period}'] = ewm_mean(self.data['Close'].to_numpy(dtype=float), 2 / (self.period + 1))
         return self.data
     
\ No newline at end of file
@@ -1,6 +1,7 @@
 from ..base import SeriesIndicator
+from ..kernels import obv
 import pandas
-import numpy as np
+from utils.profiling import timed
 
 
 
@@ -22,14 +23,12 @@ class OBV(SeriesIndicator):
         super().__init__(data)
         self.most_recent_obv: float = None
         
+    @timed
     def calculate(self) -> pandas.DataFrame:
         """
         Adds the calculated field to the dataframe parsed to the class.
         """
-        self.data['OBV'] = np.where(
-            self.data['Close'] > self.data['Close'].shift(1),  self.data['Volume'], 
-            np.where(self.data['Close'] < self.data['Close'].shift(1), -self.data['Volume'], 0)
-        ).cumsum()
+        self.data['OBV'] = obv(self.data['Close'].to_numpy(dtype=float), self.data['Volume'].to_numpy())
         self.most_recent_obv = self.data['OBV'].iloc[-1]
         return self.data
     
\ No newline at end of file
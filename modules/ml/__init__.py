@@ -1,5 +1,35 @@
-from arima_egarch import ARIMAEGARCHModel
+"""
+Models and training datasets.
 
-__all__ = [
-    'ARIMAEGARCHModel'
-]
\ No newline at end of file
+Exports are loaded on first access, so the dataset and regression tools do not pull in
+statsmodels and arch, which only ARIMAEGARCHModel needs.
+"""
+import importlib
+
+
+# Maps each exported name to the module that defines it.
+_EXPORTS = {
+    'ARIMAEGARCHModel': 'arima_egarch',
+    'Batch': 'dataset',
+    'Prefetcher': 'dataset',
+    'WindowDataset': 'dataset',
+    'WindowRegression': 'regression',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    """
+    Imports the module owning `name` on first access and caches the result.
+    """
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f'.{module}', __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
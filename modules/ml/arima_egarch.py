@@ -2,6 +2,7 @@ from statsmodels.tsa.arima.model import ARIMA
 from arch import arch_model
 import pandas as pd
 import numpy as np
+from utils.profiling import timed
 
 
 class ARIMAEGARCHModel:
@@ -42,6 +43,7 @@ class ARIMAEGARCHModel:
         """
         pass
 
+    @timed
     def fit(self, series: pd.Series):
         """
         Fit the ARIMA-EGARCH model to the given time series data.
@@ -51,11 +53,52 @@ class ARIMAEGARCHModel:
         self.fitted_arima = self.arima_model.fit()
         residuals = self.fitted_arima.resid
 
-        self.garch_model = arch_model(residuals, vol=self.vol, p=self.vol_params[0], o=self.vol_params[1], q=self.vol_params[2])
+        self.garch_model = self._build_garch(residuals)
         self.fitted_garch = self.garch_model.fit(disp="off")
 
         return self
 
+    def _build_garch(self, residuals: pd.Series):
+        return arch_model(residuals, vol=self.vol, p=self.vol_params[0], o=self.vol_params[1], q=self.vol_params[2])
+
+    def get_state(self) -> dict:
+        """
+        Returns the fitted parameters and the series they were fitted on, for snapshotting.
+        This is much smaller than the fitted result objects, and is enough to rebuild them without refitting.
+        """
+        state = {
+            'p': self.p,
+            'o': self.o,
+            'q': self.q,
+            'vol': self.vol,
+            'vol_params': self.vol_params,
+        }
+        if self.fitted_arima is not None:
+            state['log_returns'] = self.arima_model.data.orig_endog
+            state['arima_params'] = self.fitted_arima.params
+        if self.fitted_garch is not None:
+            state['garch_params'] = self.fitted_garch.params
+        return state
+
+    def set_state(self, state: dict) -> None:
+        """
+        Restores a model from get_state(). The saved parameters are applied directly
+        (Kalman filter pass / fixed-parameter ARCH), so no optimisation is rerun.
+        """
+        self.p = state['p']
+        self.o = state['o']
+        self.q = state['q']
+        self.vol = state['vol']
+        self.vol_params = state['vol_params']
+        if 'arima_params' not in state:
+            return
+
+        self.arima_model = ARIMA(state['log_returns'], order=(self.p, self.o, self.q))
+        self.fitted_arima = self.arima_model.filter(state['arima_params'])
+        if 'garch_params' in state:
+            self.garch_model = self._build_garch(self.fitted_arima.resid)
+            self.fitted_garch = self.garch_model.fix(state['garch_params'])
+
     def forecast_volatility(self, steps=1):
         """
         Forecast future volatility using the fitted GARCH model.
@@ -0,0 +1,201 @@
+import json
+import os
+import queue
+import threading
+from typing import Callable, Dict, Iterable, Iterator, NamedTuple
+import numpy as np
+import pandas as pd
+
+
+class Batch(NamedTuple):
+    """
+    A mini-batch of lookback windows for every symbol.
+
+    x: (symbols, batch, lookback) windows of log returns. A view, not a copy.
+    y: (symbols, batch) the target following each window. A view, not a copy.
+    mask: (symbols, batch) True where the window and its target are complete (no padding or gaps).
+    start: Index of the first window in the batch.
+    """
+    x: np.ndarray
+    y: np.ndarray
+    mask: np.ndarray
+    start: int
+
+
+class Prefetcher:
+    """
+    Iterates `source` on a background thread, keeping up to `depth` items ready.
+
+    @param source: The iterable to consume.
+    @param depth: Maximum number of items buffered ahead of the consumer.
+    @param prepare: Optional. Applied to each item on the background thread.
+    """
+    _DONE = object()
+
+    def __init__(self, source: Iterable, depth: int = 2, prepare: Callable = None):
+        self._queue = queue.Queue(maxsize=depth)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._fill, args=(source, prepare), name='prefetch', daemon=True)
+        self._thread.start()
+
+    def _fill(self, source: Iterable, prepare: Callable) -> None:
+        try:
+            for item in source:
+                if prepare is not None:
+                    item = prepare(item)
+                if not self._put(item):
+                    return
+        except BaseException as e:
+            self._put(e)
+            return
+        self._put(self._DONE)
+
+    def _put(self, item) -> bool:
+        # Blocks until the consumer takes room in the queue, or returns False once it has closed,
+        # so an abandoned iterator never leaves this thread (and the memory maps it reads) behind.
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def __iter__(self) -> Iterator:
+        try:
+            while True:
+                item = self._queue.get()
+                if item is self._DONE:
+                    return
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        self._stop.set()
+
+
+class WindowDataset:
+    """
+    Sliding lookback windows and targets over a multi-symbol price history, for batched training.
+
+    Log returns and targets are stored as (symbols, time) arrays in .npy files and opened as memory maps,
+    so histories larger than memory are paged in on demand. Series are right-aligned on the time axis,
+    and shorter histories are NaN-padded at the start.
+
+    Windows are stride-trick views over the memory map: window i holds the log returns at
+    [i, i + lookback), and its target is the value at i + lookback. Batches are slices of those views,
+    so producing a batch copies nothing; the mask of complete windows is computed on the prefetch thread,
+    which also pages the batch in before the consumer touches it.
+
+    @param path: Directory written by build().
+    @param lookback: Window length. Can differ between datasets built from the same files.
+    """
+    def __init__(self, path: str, lookback: int):
+        self.path = path
+        self.lookback = lookback
+        with open(os.path.join(path, 'symbols.json')) as f:
+            self.symbols = json.load(f)
+        self.returns = np.load(os.path.join(path, 'returns.npy'), mmap_mode='r')
+        self.targets = np.load(os.path.join(path, 'targets.npy'), mmap_mode='r')
+        if self.returns.shape[1] <= lookback:
+            raise ValueError(f"History of {self.returns.shape[1]} steps is too short for a lookback of {lookback}.")
+        # (symbols, windows, lookback), dropping the last window which has no target
+        self.windows = np.lib.stride_tricks.sliding_window_view(self.returns, lookback, axis=1)[:, :-1]
+        self.labels = self.targets[:, lookback:]
+
+    @classmethod
+    def build(
+            cls,
+            prices: Dict[str, pd.Series],
+            path: str,
+            lookback: int,
+            target: str = 'log_return',
+            model_factory: Callable[[], 'ARIMAEGARCHModel'] = None,
+            dtype=np.float32) -> 'WindowDataset':
+        """
+        Writes the arrays for a dataset and opens it.
+
+        @param prices: Price series per symbol, oldest first.
+        @param path: Directory to write to. Created if needed; existing files are replaced.
+        @param lookback: Window length.
+        @param target: 'log_return' predicts the next log return. 'residual' predicts the next
+        ARIMA residual, as returned by ARIMAEGARCHModel.get_residuals() after fitting each symbol.
+        @param model_factory: Builds the model fitted per symbol when target is 'residual'.
+        Defaults to ARIMAEGARCHModel, which is only imported (with statsmodels and arch) in that case.
+        @param dtype: Storage type. float32 halves memory and I/O against float64.
+        """
+        if target not in ('log_return', 'residual'):
+            raise ValueError(f"Unknown target {target!r}. Expected 'log_return' or 'residual'.")
+        if target == 'residual' and model_factory is None:
+            from .arima_egarch import ARIMAEGARCHModel
+            model_factory = ARIMAEGARCHModel
+        os.makedirs(path, exist_ok=True)
+        symbols = list(prices)
+        length = max(len(series) for series in prices.values()) - 1
+        shape = (len(symbols), length)
+        returns = np.lib.format.open_memmap(os.path.join(path, 'returns.npy'), mode='w+', dtype=dtype, shape=shape)
+        targets = np.lib.format.open_memmap(os.path.join(path, 'targets.npy'), mode='w+', dtype=dtype, shape=shape)
+        returns[:] = np.nan
+        targets[:] = np.nan
+
+        for row, symbol in enumerate(symbols):
+            series = prices[symbol]
+            log_returns = np.log(series).diff().iloc[1:]
+            returns[row, length - len(log_returns):] = log_returns.to_numpy()
+            if target == 'log_return':
+                targets[row, length - len(log_returns):] = log_returns.to_numpy()
+            else:
+                residuals = model_factory().fit(series).get_residuals()
+                targets[row, length - len(log_returns):] = residuals.reindex(log_returns.index).to_numpy()
+
+        returns.flush()
+        targets.flush()
+        del returns, targets
+        with open(os.path.join(path, 'symbols.json'), 'w') as f:
+            json.dump(symbols, f)
+        return cls(path, lookback)
+
+    def __len__(self) -> int:
+        """
+        Number of windows per symbol.
+        """
+        return self.windows.shape[1]
+
+    def batch(self, start: int, size: int) -> Batch:
+        """
+        Returns the windows [start, start + size) for every symbol, without a mask.
+        """
+        return Batch(self.windows[:, start:start + size], self.labels[:, start:start + size], None, start)
+
+    @staticmethod
+    def with_mask(batch: Batch) -> Batch:
+        mask = np.isfinite(batch.x).all(axis=-1) & np.isfinite(batch.y)
+        return batch._replace(mask=mask)
+
+    def batches(self, size: int, shuffle: bool = False, seed: int = None, prefetch: int = 2) -> Iterator[Batch]:
+        """
+        Yields batches of `size` consecutive windows per symbol, with masks.
+
+        @param size: Windows per symbol in each batch.
+        @param shuffle: Visit batches in random order. Windows within a batch stay consecutive,
+        so batches remain views.
+        @param seed: Seed for the shuffle.
+        @param prefetch: Number of batches prepared ahead on a background thread. 0 disables the thread.
+        """
+        starts = np.arange(0, len(self), size)
+        if shuffle:
+            np.random.default_rng(seed).shuffle(starts)
+        source = (self.batch(int(start), size) for start in starts)
+        if prefetch <= 0:
+            return (self.with_mask(batch) for batch in source)
+        return iter(Prefetcher(source, prefetch, self.with_mask))
+
+    def latest(self) -> np.ndarray:
+        """
+        Returns the most recent complete window for every symbol, (symbols, lookback), for inference.
+        Unlike training windows, this includes the window whose target is still in the future.
+        """
+        return self.returns[:, -self.lookback:]
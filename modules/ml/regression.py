@@ -1,4 +1,72 @@
-from statsmodels.tsa.arima.model import ARIMA
-import pandas as pd
+import numpy as np
+from .dataset import Batch, WindowDataset
 
 
+class WindowRegression:
+    """
+    Ridge regression from a lookback window to the next target, shared across symbols.
+
+    Training is incremental: each batch adds to the normal equations (X'X, X'y), so the whole
+    history never has to be in memory at once, and the solve at the end is a single
+    (lookback + 1) square system. Inference is a matrix-vector product over any number of
+    leading dimensions, so every symbol's window is predicted in one call.
+
+    @param lookback: Window length the model is trained on.
+    @param alpha: L2 regularisation strength. The intercept is not regularised.
+    """
+    def __init__(self, lookback: int, alpha: float = 1e-6):
+        self.lookback = lookback
+        self.alpha = alpha
+        self.coef = None
+        self.intercept = 0.0
+        self.samples = 0
+        self._xtx = np.zeros((lookback + 1, lookback + 1))
+        self._xty = np.zeros(lookback + 1)
+
+    def partial_fit(self, batch: Batch) -> 'WindowRegression':
+        """
+        Adds the complete windows of a batch to the normal equations.
+        """
+        x = batch.x[batch.mask].astype(np.float64)
+        y = batch.y[batch.mask].astype(np.float64)
+        if len(x) == 0:
+            return self
+        sums = x.sum(axis=0)
+        self._xtx[:-1, :-1] += x.T @ x
+        self._xtx[:-1, -1] += sums
+        self._xtx[-1, :-1] += sums
+        self._xtx[-1, -1] += len(x)
+        self._xty[:-1] += x.T @ y
+        self._xty[-1] += y.sum()
+        self.samples += len(x)
+        return self
+
+    def solve(self) -> 'WindowRegression':
+        """
+        Solves for the coefficients from everything added so far.
+        """
+        if self.samples == 0:
+            raise ValueError("Model must be given data before solving.")
+        penalty = np.full(self.lookback + 1, self.alpha)
+        penalty[-1] = 0.0
+        weights = np.linalg.solve(self._xtx + np.diag(penalty), self._xty)
+        self.coef = weights[:-1]
+        self.intercept = weights[-1]
+        return self
+
+    def fit(self, dataset: WindowDataset, batch_size: int = 1024) -> 'WindowRegression':
+        """
+        Fits the model on every complete window of the dataset.
+        """
+        for batch in dataset.batches(batch_size):
+            self.partial_fit(batch)
+        return self.solve()
+
+    def predict(self, x: np.ndarray) -> np.ndarray:
+        """
+        Predicts the next target for windows of shape (..., lookback), e.g. (symbols, lookback)
+        from WindowDataset.latest() or (symbols, batch, lookback) from a Batch.
+        """
+        if self.coef is None:
+            raise ValueError("Model must be fit before predicting.")
+        return np.asarray(x, dtype=np.float64) @ self.coef + self.intercept
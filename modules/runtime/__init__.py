@@ -0,0 +1,33 @@
+"""
+Multi-process runtime: a coordinator process and shard workers.
+
+Exports are loaded on first access, so HashRing can be used without importing the broker,
+strategies and pandas that the coordinator and workers need.
+"""
+import importlib
+
+
+# Maps each exported name to the module that defines it.
+_EXPORTS = {
+    'Coordinator': 'coordinator',
+    'HashRing': 'ring',
+    'ShardWorker': 'worker',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    """
+    Imports the module owning `name` on first access and caches the result.
+    """
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f'.{module}', __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,246 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+from typing import Callable, Dict, Iterable, List
+from aiopubsub import Hub
+from ..broker.broker import Broker
+from ..data.journal import Journal
+from ..strategy.base.base import Strategy
+from ..strategy.base.bollingerStrategy import BollingerStrategy
+from utils import profiling
+from utils.log import receive_logging
+from .ring import HashRing
+from .worker import run_worker
+
+
+logger = logging.getLogger(__name__)
+
+# Seconds a stopping worker is given to finish its cycle before it is terminated.
+STOP_TIMEOUT = 5.0
+
+
+class Coordinator:
+    """
+    Splits the watchlist across worker processes and owns order routing and risk.
+
+    Symbols are assigned to shards with a consistent hash ring, so changing the watchlist or the
+    number of workers only moves the symbols that have to move. Each shard runs a ShardWorker in
+    its own process, connected to the coordinator by a local socket pair. Workers send back only
+    small CIV dictionaries; data frames, indicators and strategies never leave their process.
+    The coordinator's Broker turns CIVs into orders, so positions and risk checks live in one place.
+
+    A worker that dies is respawned with the same shard id and symbols.
+
+    Workers log through the coordinator, journal their strategies' signals to the coordinator's
+    journal, and report their timers while profiling is enabled, so all shards show up in the
+    coordinator's log, journal and latency export.
+
+    Workers are started with the 'spawn' method, so they do not inherit the coordinator's
+    threads (logging, journal) or event loop.
+
+    @param broker_api: Base URL for data and orders.
+    @param symbols: The initial watchlist.
+    @param workers: Number of worker processes. Defaults to the number of CPU cores.
+    @param interval: Seconds between data refreshes in each worker.
+    @param journal: Optional. Passed to the coordinator's Broker to record orders.
+    @param strategy_factory: Builds each worker's strategies. Must be picklable.
+    @param config: Passed to every strategy.
+    @param model_factory: Optional. Builds the model each worker fits per symbol. Must be picklable.
+    @param snapshot_dir: Where each worker snapshots its strategies and models, one file per shard.
+    @param respawn_delay: Seconds to wait before replacing a dead worker.
+    """
+    def __init__(
+            self,
+            broker_api: str,
+            symbols: Iterable[str],
+            workers: int = None,
+            interval: float = 60.0,
+            journal: Journal = None,
+            strategy_factory: Callable[..., Strategy] = BollingerStrategy,
+            config: dict = None,
+            model_factory: Callable = None,
+            snapshot_dir: str = 'data/snapshots',
+            respawn_delay: float = 1.0):
+        self.broker_api = broker_api
+        self.symbols = list(symbols)
+        self.interval = interval
+        self.journal = journal
+        self.strategy_factory = strategy_factory
+        self.config = config if config else {}
+        self.model_factory = model_factory
+        self.snapshot_dir = snapshot_dir
+        self.respawn_delay = respawn_delay
+        self.ring = HashRing(range(workers or os.cpu_count() or 1))
+        self.assignment: Dict[int, List[str]] = {}
+        self.processes: Dict[int, multiprocessing.Process] = {}
+        self.connections = {}
+        self.broker = None
+        self._state = {}
+        self._context = multiprocessing.get_context('spawn')
+        self._pending = set()
+        self._stopped = None
+        self._log_queue = None
+
+    async def run(self) -> None:
+        """
+        Starts the workers and routes their signals until close() is called.
+        """
+        loop = asyncio.get_running_loop()
+        self._stopped = loop.create_future()
+        self.broker = Broker(self.broker_api, Hub(), self.journal)
+        self.broker.set_state(self._state)
+        self._log_queue = self._context.Queue()
+        log_listener = receive_logging(self._log_queue)
+        for shard in sorted(self.ring.nodes):
+            self._spawn(shard)
+        self._rebalance()
+        try:
+            await self._stopped
+        finally:
+            await self._shutdown()
+            log_listener.stop()
+
+    async def close(self) -> None:
+        if self._stopped is not None and not self._stopped.done():
+            self._stopped.set_result(None)
+
+    def set_watchlist(self, symbols: Iterable[str]) -> None:
+        """
+        Replaces the watchlist. Only shards whose symbols change are notified.
+        """
+        self.symbols = list(symbols)
+        self._rebalance()
+
+    async def resize(self, workers: int) -> None:
+        """
+        Changes the number of worker processes while running, moving only the symbols of the added or removed shards.
+        Returns once the removed workers have exited.
+        """
+        current = sorted(self.ring.nodes)
+        for shard in range(len(current), workers):
+            self.ring.add(shard)
+            self._spawn(shard)
+        removed = current[workers:]
+        for shard in removed:
+            self.ring.remove(shard)
+            self.assignment.pop(shard, None)
+        self._rebalance()
+        await asyncio.gather(*(self._stop_worker(shard) for shard in removed))
+
+    def _spawn(self, shard: int) -> None:
+        parent, child = self._context.Pipe()
+        process = self._context.Process(
+            target=run_worker,
+            args=(shard, child, self.broker_api, self.interval, self.strategy_factory, self.config),
+            kwargs={
+                'model_factory': self.model_factory,
+                'snapshot_dir': self.snapshot_dir,
+                'journal': self.journal is not None,
+                'log_queue': self._log_queue,
+                'log_level': logging.getLogger().getEffectiveLevel(),
+                'profile': profiling.is_enabled(),
+            },
+            name=f'shard-{shard}',
+            daemon=True,
+        )
+        process.start()
+        child.close()
+        self.processes[shard] = process
+        self.connections[shard] = parent
+        asyncio.get_running_loop().add_reader(parent.fileno(), self._on_message, shard)
+        if shard in self.assignment:
+            parent.send(('assign', self.assignment[shard]))
+
+    async def _stop_worker(self, shard: int) -> None:
+        conn = self.connections.pop(shard)
+        asyncio.get_running_loop().remove_reader(conn.fileno())
+        try:
+            conn.send(('stop',))
+        except OSError:
+            pass
+        process = self.processes.pop(shard)
+        await self._join(process, STOP_TIMEOUT)
+        if process.is_alive():
+            process.terminate()
+            await self._join(process, STOP_TIMEOUT)
+        # Handle what the worker sent while finishing its cycle, including its final stats.
+        try:
+            while conn.poll():
+                self._handle(shard, conn.recv())
+        except (EOFError, OSError):
+            pass
+        conn.close()
+
+    @staticmethod
+    async def _join(process: multiprocessing.Process, timeout: float) -> None:
+        # Waiting for a worker to finish its cycle takes up to seconds; do it on a thread so
+        # the event loop keeps routing the other shards' signals meanwhile.
+        await asyncio.get_running_loop().run_in_executor(None, process.join, timeout)
+
+    def _rebalance(self) -> None:
+        assignment = self.ring.assign(self.symbols)
+        for shard, symbols in assignment.items():
+            changed = shard not in self.assignment or sorted(symbols) != sorted(self.assignment[shard])
+            # A shard without a connection is being respawned, and is sent its symbols once it is back.
+            if changed and shard in self.connections:
+                self.connections[shard].send(('assign', symbols))
+        moved = sum(len(set(s) - set(self.assignment.get(shard, []))) for shard, s in assignment.items())
+        self.assignment = assignment
+        logger.info("Watchlist of %d symbols across %d shards, %d moved", len(self.symbols), len(assignment), moved)
+
+    def _on_message(self, shard: int) -> None:
+        conn = self.connections[shard]
+        try:
+            while conn.poll():
+                self._handle(shard, conn.recv())
+        except (EOFError, OSError):
+            self._on_worker_exit(shard)
+
+    def _handle(self, shard: int, message: tuple) -> None:
+        if message[0] == 'civ':
+            task = asyncio.ensure_future(self.broker.on_civ_update(message[2]))
+            self._pending.add(task)
+            task.add_done_callback(self._pending.discard)
+        elif message[0] == 'journal' and self.journal is not None:
+            record = message[1]
+            self.journal.record(record.pop('kind'), **record)
+        elif message[0] == 'stats':
+            profiling.report(f'shard-{shard}', message[2])
+
+    def _on_worker_exit(self, shard: int) -> None:
+        conn = self.connections.pop(shard)
+        asyncio.get_running_loop().remove_reader(conn.fileno())
+        conn.close()
+        task = asyncio.ensure_future(self._reap(shard, self.processes.pop(shard)))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _reap(self, shard: int, process: multiprocessing.Process) -> None:
+        await self._join(process, STOP_TIMEOUT)
+        if self._stopped.done() or shard not in self.ring.nodes:
+            return
+        logger.error("Shard %s exited with code %s. Respawning in %.1fs", shard, process.exitcode, self.respawn_delay)
+        asyncio.get_running_loop().call_later(self.respawn_delay, self._respawn, shard)
+
+    def _respawn(self, shard: int) -> None:
+        if not self._stopped.done() and shard in self.ring.nodes and shard not in self.processes:
+            self._spawn(shard)
+
+    async def _shutdown(self) -> None:
+        await asyncio.gather(*(self._stop_worker(shard) for shard in list(self.connections)))
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+        await self.broker.close()
+
+    def get_state(self) -> dict:
+        """
+        Returns the positions held by the coordinator's broker, for snapshotting.
+        """
+        return self.broker.get_state() if self.broker is not None else self._state
+
+    def set_state(self, state: dict) -> None:
+        """
+        Restores state previously returned by get_state(). Applied to the broker when run() starts.
+        """
+        self._state = state
@@ -0,0 +1,65 @@
+import bisect
+import hashlib
+from typing import Dict, Hashable, Iterable, List
+
+
+def _hash(key: str) -> int:
+    # Stable across processes and runs, unlike hash(), so every process agrees on ownership.
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), 'big')
+
+
+class HashRing:
+    """
+    Consistent hash ring mapping symbols to shards.
+
+    Each shard is placed on the ring at `replicas` pseudo-random points, and a symbol belongs to
+    the shard owning the first point clockwise of the symbol's hash. Adding or removing a shard
+    only moves the symbols adjacent to its points, roughly 1/N of the watchlist, so a rebalance
+    does not reshuffle every worker's indicators and strategies.
+
+    @param nodes: Initial shards.
+    @param replicas: Points per shard. More points give a more even spread.
+    """
+    def __init__(self, nodes: Iterable[Hashable] = (), replicas: int = 64):
+        self.replicas = replicas
+        self._points: List[int] = []
+        self._owners: Dict[int, Hashable] = {}
+        self.nodes = set()
+        for node in nodes:
+            self.add(node)
+
+    def add(self, node: Hashable) -> None:
+        if node in self.nodes:
+            return
+        self.nodes.add(node)
+        for i in range(self.replicas):
+            point = _hash(f'{node}#{i}')
+            self._owners[point] = node
+            bisect.insort(self._points, point)
+
+    def remove(self, node: Hashable) -> None:
+        if node not in self.nodes:
+            return
+        self.nodes.remove(node)
+        for i in range(self.replicas):
+            point = _hash(f'{node}#{i}')
+            del self._owners[point]
+            self._points.pop(bisect.bisect_left(self._points, point))
+
+    def node_for(self, key: str) -> Hashable:
+        """
+        Returns the shard that owns `key`.
+        """
+        if not self._points:
+            raise ValueError("HashRing has no nodes.")
+        index = bisect.bisect(self._points, _hash(key)) % len(self._points)
+        return self._owners[self._points[index]]
+
+    def assign(self, keys: Iterable[str]) -> Dict[Hashable, List[str]]:
+        """
+        Returns every shard's keys. Shards without keys are included with an empty list.
+        """
+        assignment = {node: [] for node in self.nodes}
+        for key in keys:
+            assignment[self.node_for(key)].append(key)
+        return assignment
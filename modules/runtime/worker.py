@@ -0,0 +1,202 @@
+import asyncio
+import logging
+import os
+import signal
+import time
+from multiprocessing.connection import Connection
+from typing import Callable
+from aiopubsub import Hub, Key, Subscriber
+from ..bots.supervisor import Supervisor
+from ..bots.trader import Trader
+from ..broker.broker import Broker
+from ..data.snapshot import SnapshotStore
+from ..strategy.base.base import Strategy
+from ..strategy.base.bollingerStrategy import BollingerStrategy
+from utils import profiling
+from utils.log import forward_logging
+
+
+logger = logging.getLogger(__name__)
+
+# Seconds between reports of a worker's timers and counters to the coordinator, while profiling is enabled.
+STATS_INTERVAL = 30.0
+
+
+class _CoordinatorJournal:
+    """
+    Stands in for a Journal in a worker process: records are sent to the coordinator, which
+    writes them to its own journal, so every shard's signals land in one ordered set of files.
+    """
+    def __init__(self, conn: Connection):
+        self.conn = conn
+
+    def record(self, kind: str, **fields) -> None:
+        fields['kind'] = kind
+        fields.setdefault('ts', time.time())
+        try:
+            self.conn.send(('journal', fields))
+        except OSError:
+            # The coordinator has gone away, and this worker is about to stop.
+            pass
+
+
+class ShardWorker:
+    """
+    Runs data refresh, indicators and strategies for one shard of the watchlist.
+
+    Each worker lives in its own process with its own event loop, so indicator and strategy
+    work for different shards runs on different cores. Within the process, a Broker fetches
+    the shard's data and a Trader keeps each symbol's strategy warm between updates. The worker
+    does not place orders: it forwards each symbol's Confidence Index Vector (CIV) to the
+    Coordinator, which owns order routing and risk.
+
+    The worker is run by a Supervisor in its process (see run_worker()), which restarts it on
+    failure and snapshots the Trader's strategies and models per shard.
+
+    Messages from the coordinator:
+        ('assign', [symbols]): replaces the worker's symbols.
+        ('stop',): finishes the current cycle and exits.
+    Messages to the coordinator:
+        ('civ', shard_id, civ): civ is a dictionary of BUY/HOLD/SELL confidence and 'symbol'.
+        ('journal', record): a signal emitted by a strategy, for the coordinator's journal.
+        ('stats', shard_id, stats): the worker's profiling.stats(), while profiling is enabled.
+
+    @param shard_id: This worker's node on the coordinator's hash ring.
+    @param conn: The worker's end of the channel to the coordinator.
+    @param broker_api: Base URL data is fetched from.
+    @param interval: Seconds between data refreshes.
+    @param strategy_factory: Builds a strategy from (data, symbol=..., config=...). Must be picklable.
+    @param config: Passed to every strategy.
+    @param model_factory: Optional. Passed to the Trader. Must be picklable.
+    @param journal: Send strategies' signals to the coordinator's journal.
+    """
+    def __init__(
+            self,
+            shard_id: int,
+            conn: Connection,
+            broker_api: str,
+            interval: float = 60.0,
+            strategy_factory: Callable[..., Strategy] = BollingerStrategy,
+            config: dict = None,
+            model_factory: Callable = None,
+            journal: bool = False):
+        self.shard_id = shard_id
+        self.conn = conn
+        self.broker_api = broker_api
+        self.interval = interval
+        self.strategy_factory = strategy_factory
+        self.config = config if config else {}
+        self.model_factory = model_factory
+        self.journal = _CoordinatorJournal(conn) if journal else None
+        self.symbols = []
+        self.trader = None
+        self._state = {}
+        self._stopped = None
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        hub = Hub()
+        # Orders are placed by the coordinator's broker only, so this one just fetches the shard's data.
+        broker = Broker(self.broker_api, hub, route_orders=False)
+        self.trader = Trader(
+            self.broker_api, hub, self.strategy_factory, self.config, journal=self.journal, model_factory=self.model_factory)
+        self.trader.set_state(self._state.get('trader', {}))
+        subscriber = Subscriber(hub, f'shard-{self.shard_id}')
+        subscriber.add_async_listener(Key('trading', 'civ_update'), self.on_civ)
+        self._stopped = loop.create_future()
+        loop.add_reader(self.conn.fileno(), self._on_message)
+        reported = loop.time()
+        try:
+            while not self._stopped.done():
+                started = loop.time()
+                if self.symbols:
+                    await broker.update_all(self.symbols)
+                if loop.time() - reported >= STATS_INTERVAL:
+                    self._report_stats()
+                    reported = loop.time()
+                await asyncio.wait([self._stopped], timeout=max(0.0, self.interval - (loop.time() - started)))
+        finally:
+            self._report_stats()
+            loop.remove_reader(self.conn.fileno())
+            await subscriber.remove_all_listeners()
+            await self.trader.close()
+            await broker.close()
+
+    async def on_civ(self, key: Key, civ: dict) -> None:
+        if civ['symbol'] not in self.symbols:
+            # Published before the symbol moved to another shard
+            return
+        self.conn.send(('civ', self.shard_id, civ))
+
+    def _on_message(self) -> None:
+        try:
+            while self.conn.poll():
+                message = self.conn.recv()
+                if message[0] == 'assign':
+                    self.symbols = list(message[1])
+                    self.trader.retain(self.symbols)
+                    logger.info("Shard %s assigned %d symbols", self.shard_id, len(self.symbols))
+                elif message[0] == 'stop':
+                    self._stop()
+        except (EOFError, OSError):
+            # The coordinator has gone away; there is nobody left to send signals to.
+            self._stop()
+
+    def _report_stats(self) -> None:
+        if not profiling.is_enabled():
+            return
+        try:
+            self.conn.send(('stats', self.shard_id, profiling.stats()))
+        except OSError:
+            pass
+
+    def _stop(self) -> None:
+        if not self._stopped.done():
+            self._stopped.set_result(None)
+
+    def get_state(self) -> dict:
+        """
+        Returns the shard's symbols and the Trader's strategies and models, for snapshotting.
+        """
+        trader = self.trader.get_state() if self.trader is not None else self._state.get('trader', {})
+        return {'symbols': self.symbols, 'trader': trader}
+
+    def set_state(self, state: dict) -> None:
+        """
+        Restores state previously returned by get_state(). The Trader's part is applied when run() starts.
+        """
+        self.symbols = list(state.get('symbols', []))
+        self._state = state
+
+
+def run_worker(
+        shard_id: int,
+        conn: Connection,
+        broker_api: str,
+        interval: float,
+        strategy_factory: Callable[..., Strategy],
+        config: dict,
+        model_factory: Callable = None,
+        snapshot_dir: str = 'data/snapshots',
+        journal: bool = False,
+        log_queue=None,
+        log_level: int = logging.INFO,
+        profile: bool = False) -> None:
+    """
+    Process entry point for a ShardWorker. The worker runs under a Supervisor with its own
+    snapshot file, so a failure restarts it in place with its strategies, and a respawned
+    process picks up where the last one stopped.
+
+    Logging goes to `log_queue` for the coordinator to write, and profiling is enabled here
+    when it is in the coordinator, as neither carries over to a spawned process.
+    """
+    # Interrupts (Ctrl-C reaches the whole process group) are handled by the coordinator, which stops workers in order.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    if log_queue is not None:
+        forward_logging(log_queue, log_level)
+    if profile:
+        profiling.enable()
+    supervisor = Supervisor(SnapshotStore(os.path.join(snapshot_dir, f'shard-{shard_id}.pkl')))
+    supervisor.add('worker', lambda: ShardWorker(
+        shard_id, conn, broker_api, interval, strategy_factory, config, model_factory, journal))
+    asyncio.run(supervisor.run())
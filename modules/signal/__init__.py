@@ -1,5 +1,5 @@
-from trend import Trend
-from trade import Trade
+from .trend import Trend
+from .trade import Trade
 
 __all__ = [
     'Trend', 
@@ -1,4 +1,4 @@
-from base import *
+from .base import BollingerStrategy
 
 __all__ = [
     'BollingerStrategy'
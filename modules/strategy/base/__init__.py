@@ -1,4 +1,4 @@
-from bollingerStrategy import BollingerStrategy
+from .bollingerStrategy import BollingerStrategy
 
 __all__ = [
     'BollingerStrategy'
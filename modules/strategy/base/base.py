@@ -1,19 +1,92 @@
+import logging
 import pandas
 from abc import ABC, abstractmethod
+from ...data.journal import Journal
+from ...indicators.base import LiteralIndicator, SeriesIndicator
+from ...signal.trade import Trade
+from utils.profiling import count
 
 
+logger = logging.getLogger(__name__)
 
 
 class Strategy(ABC):
     """
     Abstract base class for all trading strategies.
+
+    @param data: A pandas DataFrame containing the historical price data.
+    @param symbol: Optional. The symbol the data belongs to, recorded with emitted signals.
+    @param journal: Optional. A Journal that emitted signals are recorded to.
     """
-    def __init__(self, data : pandas.DataFrame):
+    def __init__(self, data : pandas.DataFrame, symbol: str = None, journal: Journal = None):
         self.data = data
+        self.symbol = symbol
+        self.journal = journal
     
     @abstractmethod
     def get_signal(self):
         """
         Returns a signal (BUY, SELL, HOLD) based on the strategy's logic.
         """
-        raise NotImplementedError("This is an abstract class. Please implement the methods in a subclass.")
\ No newline at end of file
+        raise NotImplementedError("This is an abstract class. Please implement the methods in a subclass.")
+
+    def get_civ(self) -> dict:
+        """
+        Returns the Confidence Index Vector (CIV): the share of the strategy's signal_*() rules
+        that currently indicate BUY, HOLD and SELL. Uncertain signals (SQUEEZE) count towards HOLD.
+        """
+        rules = [name for name in dir(type(self)) if name.startswith('signal_')]
+        civ = {Trade.HOLD.name: 0.0, Trade.BUY.name: 0.0, Trade.SELL.name: 0.0}
+        for name in rules:
+            signal = getattr(self, name)()
+            civ[signal.name if signal.name in civ else Trade.HOLD.name] += 1 / len(rules)
+        return civ
+
+    def emit(self, rule: str, signal: Trade) -> Trade:
+        """
+        Logs and journals a detected signal, then returns it.
+
+        @param rule: The rule that produced the signal, e.g. 'breakout'.
+        @param signal: The detected signal.
+        """
+        name = type(self).__name__
+        close = float(self.data['Close'].iloc[-1])
+        count(f'signals.{signal.name}')
+        logger.info("%s detected a %s %s signal", name, rule, signal.name,
+                    extra={'strategy': name, 'rule': rule, 'signal': signal.name, 'symbol': self.symbol})
+        if self.journal is not None:
+            self.journal.record('signal', strategy=name, rule=rule, signal=signal.name, symbol=self.symbol, close=close)
+        return signal
+
+    def update(self, data: pandas.DataFrame) -> None:
+        """
+        Replaces the data window, keeping the strategy, its position and the indicators it owns.
+        Indicators that were reading the previous window are pointed at the new one.
+        """
+        for value in self.__dict__.values():
+            if isinstance(value, (SeriesIndicator, LiteralIndicator)) and value.data is self.data:
+                value.data = data
+        self.data = data
+
+    def get_state(self) -> dict:
+        """
+        Returns the running state of the strategy, including the state of any indicators it owns, for snapshotting.
+        """
+        state = {}
+        for name, value in self.__dict__.items():
+            if name == 'journal':
+                continue
+            state[name] = value.get_state() if isinstance(value, (SeriesIndicator, LiteralIndicator)) else value
+        return state
+
+    def set_state(self, state: dict) -> None:
+        """
+        Restores state previously returned by get_state(). Indicator state is restored into the
+        strategy's own indicators, so they keep their type and configuration.
+        """
+        for name, value in state.items():
+            current = getattr(self, name, None)
+            if isinstance(current, (SeriesIndicator, LiteralIndicator)):
+                current.set_state(value)
+            else:
+                setattr(self, name, value)
@@ -1,10 +1,12 @@
-from ....utils.utils import is_local_min, is_local_max
+from utils.utils import is_local_min, is_local_max
 from ...indicators.series_.bollinger import Bollinger
 from ...indicators.series_.ma import SMA
 from ...signal.trade import Trade
 from ...signal.trend import Trend
-from base import Strategy
+from ...data.journal import Journal
+from .base import Strategy
 import pandas as pd
+from utils.profiling import timed
 
 
 class BollingerStrategy(Strategy):
@@ -18,9 +20,11 @@ class BollingerStrategy(Strategy):
             bollinger: Bollinger = None, 
             period: int = 20, 
             std_dev: int = 2,
-            config: dict = None):
+            config: dict = None,
+            symbol: str = None,
+            journal: Journal = None):
         
-        super().__init__(data)
+        super().__init__(data, symbol, journal)
         if bollinger is None:
             self.bollinger = Bollinger(data, period, std_dev)
         else:
@@ -37,6 +41,14 @@ class BollingerStrategy(Strategy):
         self.lookback = self.config.get('lookback', 20)
         
 
+    def get_signal(self) -> Trade:
+        """
+        Returns the signal with the highest confidence across all of the Bollinger rules.
+        """
+        civ = self.get_civ()
+        return Trade[max(civ, key=civ.get)]
+
+    @timed
     def signal_breakout(self) -> Trade:
         """
         Returns a signal (BUY, SELL, HOLD) based on the Bollinger Bands strategy.
@@ -52,14 +64,13 @@ class BollingerStrategy(Strategy):
 
         # Check for buy/sell signals based on Bollinger Bands
         if self.data['Close'].iloc[-1] < bollinger_data['Lower Band'].iloc[-1]:
-            print("Bollinger detected a breakout buy signal")
-            return Trade.BUY
+            return self.emit('breakout', Trade.BUY)
         elif self.data['Close'].iloc[-1] > bollinger_data['Upper Band'].iloc[-1]:
-            print("Bollinger detected a breakout sell signal")
-            return Trade.SELL
+            return self.emit('breakout', Trade.SELL)
         else:
             return Trade.HOLD
         
+    @timed
     def signal_riding(self) -> Trade:
         """
         Uses 'Riding the Bands' strategy to determine what signal is relevant.
@@ -82,15 +93,13 @@ class BollingerStrategy(Strategy):
             # CIV calculation purposes, as it indicates the nature of the current trend.
             if trend in (Trend.STR_UP, Trend.UP):
                 if (band_position > self.buy_threshold) & (band_position <= 1):
-                    print("Bollinger detected a riding buy signal")
-                    return Trade.BUY
+                    return self.emit('riding', Trade.BUY)
                 else:
                     return Trade.HOLD
                 
             elif trend in (Trend.STR_DOWN, Trend.DOWN):
                 if (band_position < self.sell_threshold) & (band_position >= 0):
-                    print("Bollinger detected a riding sell signal")
-                    return Trade.SELL
+                    return self.emit('riding', Trade.SELL)
                 else:
                     return Trade.HOLD
                 
@@ -124,17 +133,18 @@ class BollingerStrategy(Strategy):
                 # No clear trend
                 return Trade.HOLD
 
+    @timed
     def signal_squeeze(self) -> Trade:
         """
         Uses the 'Bollinger Squeeze' strategy to determine what signal is relevant.
         """
         # TODO: Review this 'is_squeezed' method if            
         if self.bollinger.is_squeezed():
-            print("Bollinger detected a squeeze signal")
-            return Trade.SQUEEZE
+            return self.emit('squeeze', Trade.SQUEEZE)
         else:
             return Trade.HOLD
 
+    @timed
     def signal_bounce(self) -> Trade:
         """
         Asserts a trade signal if the price is bouncing off the bands.
@@ -158,11 +168,9 @@ class BollingerStrategy(Strategy):
         recent_prices = self.data['Close'].iloc[-(lookback+1):].values
 
         if band_position < self.lower_bounce and is_local_min(recent_prices):
-            print("Bollinger detected a bounce buy signal")
-            return Trade.BUY
+            return self.emit('bounce', Trade.BUY)
         elif band_position > self.upper_bounce and is_local_max(recent_prices):
-            print("Bollinger detected a bounce sell signal")
-            return Trade.SELL
+            return self.emit('bounce', Trade.SELL)
         else:
             return Trade.HOLD
                 
\ No newline at end of file
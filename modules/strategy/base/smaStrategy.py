@@ -1,4 +1,4 @@
 from ...indicators.series_.ma import SMA, EMA
 from ...signal.trade import Trade
-from base import Strategy
+from .base import Strategy
 import pandas as pd
\ No newline at end of file
@@ -0,0 +1,28 @@
+import asyncio
+import aiohttp
+from aiopubsub import Hub, Key, Publisher
+from modules.broker.broker import Broker
+
+
+class UnreachableBroker(Broker):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.attempts = []
+
+    async def place_order(self, order):
+        self.attempts.append(order)
+        raise aiohttp.ClientConnectionError('connection refused')
+
+
+def test_failed_order_does_not_stop_order_routing():
+    async def main():
+        hub = Hub()
+        broker = UnreachableBroker('http://localhost', hub)
+        publisher = Publisher(hub, prefix=Key('trading'))
+        for symbol in ('AAA', 'BBB'):
+            publisher.publish(Key('civ_update'), {'symbol': symbol, 'BUY': 0.9})
+            await asyncio.sleep(0.05)
+        await broker.close()
+        return broker.attempts
+
+    assert [order['symbol'] for order in asyncio.run(main())] == ['AAA', 'BBB']
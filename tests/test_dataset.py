@@ -0,0 +1,164 @@
+import time
+import numpy as np
+import pandas as pd
+import pytest
+from modules.ml.dataset import Batch, Prefetcher, WindowDataset
+from modules.ml.regression import WindowRegression
+
+
+LOOKBACK = 5
+
+
+def series(n: int, seed: int) -> pd.Series:
+    return pd.Series(100 * np.exp(np.cumsum(np.random.default_rng(seed).normal(0, 0.01, n))))
+
+
+@pytest.fixture
+def dataset(tmp_path):
+    # BBB is 20 steps shorter than AAA, so its row is NaN-padded at the start.
+    prices = {'AAA': series(60, 0), 'BBB': series(40, 1)}
+    return WindowDataset.build(prices, str(tmp_path), LOOKBACK, dtype=np.float64), prices
+
+
+def test_windows_and_targets_align(dataset):
+    dataset, prices = dataset
+    returns = np.log(prices['AAA']).diff().iloc[1:].to_numpy()
+    assert len(dataset) == len(returns) - LOOKBACK
+    for i in (0, 17, len(dataset) - 1):
+        np.testing.assert_allclose(dataset.windows[0, i], returns[i:i + LOOKBACK])
+        assert dataset.labels[0, i] == pytest.approx(returns[i + LOOKBACK])
+
+
+def test_batches_are_views_of_the_memmap(dataset):
+    dataset, _ = dataset
+    for batch in dataset.batches(8, prefetch=0):
+        assert np.shares_memory(batch.x, dataset.returns)
+        assert np.shares_memory(batch.y, dataset.targets)
+
+
+def test_mask_excludes_padding(dataset):
+    dataset, _ = dataset
+    batch = next(iter(dataset.batches(len(dataset), prefetch=0)))
+    assert batch.mask[0].all()
+    # BBB's returns start at step 20, so its first complete window starts there.
+    np.testing.assert_array_equal(batch.mask[1], np.arange(len(dataset)) >= 20)
+
+
+def test_prefetched_batches_match(dataset):
+    dataset, _ = dataset
+    direct = list(dataset.batches(8, shuffle=True, seed=3, prefetch=0))
+    prefetched = list(dataset.batches(8, shuffle=True, seed=3, prefetch=2))
+    assert [b.start for b in prefetched] == [b.start for b in direct]
+    for a, b in zip(direct, prefetched):
+        np.testing.assert_array_equal(a.mask, b.mask)
+
+
+def test_unknown_target(tmp_path):
+    with pytest.raises(ValueError):
+        WindowDataset.build({'AAA': series(20, 0)}, str(tmp_path), LOOKBACK, target='price')
+
+
+class ScaledResiduals:
+    """
+    Model stand-in whose residuals are ten times the log returns, missing the first one as
+    a differenced model's would.
+    """
+    def fit(self, series: pd.Series) -> 'ScaledResiduals':
+        self.residuals = 10 * np.log(series).diff().iloc[2:]
+        return self
+
+    def get_residuals(self) -> pd.Series:
+        return self.residuals
+
+
+def test_residual_targets_align(tmp_path):
+    prices = {'AAA': series(60, 0), 'BBB': series(40, 1)}
+    dataset = WindowDataset.build(
+        prices, str(tmp_path), LOOKBACK, target='residual', model_factory=ScaledResiduals, dtype=np.float64)
+    np.testing.assert_allclose(dataset.targets[0, 1:], 10 * dataset.returns[0, 1:])
+    assert np.isnan(dataset.targets[0, 0])
+    # BBB is padded by 20 steps, and has no residual for its first return.
+    assert np.isnan(dataset.targets[1, :21]).all()
+    np.testing.assert_allclose(dataset.targets[1, 21:], 10 * dataset.returns[1, 21:])
+    np.testing.assert_allclose(dataset.labels[:, 30], 10 * dataset.returns[:, 30 + LOOKBACK])
+
+
+@pytest.mark.filterwarnings('ignore:y is poorly scaled')
+def test_residual_targets_from_the_arima_model(tmp_path):
+    pytest.importorskip('arch')
+    from modules.ml.arima_egarch import ARIMAEGARCHModel
+    prices = {'AAA': series(200, 0)}
+    dataset = WindowDataset.build(prices, str(tmp_path), LOOKBACK, target='residual', dtype=np.float64)
+    residuals = ARIMAEGARCHModel().fit(prices['AAA']).get_residuals()
+    np.testing.assert_allclose(dataset.targets[0], residuals.to_numpy())
+    assert dataset.labels[0, 0] == pytest.approx(residuals.iloc[LOOKBACK])
+
+
+@pytest.mark.parametrize('ending', ['exhausted', 'failed'])
+def test_prefetcher_thread_exits_after_close(ending):
+    def source():
+        yield 1
+        if ending == 'failed':
+            raise RuntimeError('read failed')
+
+    prefetcher = Prefetcher(source(), depth=1)
+    # Let the thread fill the queue and block on the end-of-source item.
+    time.sleep(0.2)
+    prefetcher.close()
+    prefetcher._thread.join(timeout=2)
+    assert not prefetcher._thread.is_alive()
+
+
+def test_prefetcher_raises_source_errors():
+    def source():
+        yield 1
+        raise RuntimeError('read failed')
+
+    items = []
+    with pytest.raises(RuntimeError):
+        for item in Prefetcher(source()):
+            items.append(item)
+    assert items == [1]
+
+
+def test_regression_recovers_coefficients():
+    rng = np.random.default_rng(0)
+    coef, intercept = np.array([0.5, -0.25, 2.0]), 0.1
+    x = rng.normal(size=(4, 500, 3))
+    y = x @ coef + intercept
+    mask = np.ones((4, 500), dtype=bool)
+    # Incomplete windows are skipped, whatever they hold.
+    x[0, :10], mask[0, :10] = np.nan, False
+
+    model = WindowRegression(3, alpha=0.0)
+    for start in range(0, 500, 128):
+        part = slice(start, start + 128)
+        model.partial_fit(Batch(x[:, part], y[:, part], mask[:, part], start))
+    model.solve()
+
+    np.testing.assert_allclose(model.coef, coef, atol=1e-9)
+    assert model.intercept == pytest.approx(intercept)
+    assert model.samples == 4 * 500 - 10
+    np.testing.assert_allclose(model.predict(x[1:, :5]), y[1:, :5])
+
+
+def test_regression_fits_an_autoregressive_dataset(tmp_path):
+    # r[t] = 0.5 r[t-1] - 0.3 r[t-2] + noise, so the window [r[t-2], r[t-1]] predicts r[t].
+    rng = np.random.default_rng(0)
+    returns = np.zeros(20000)
+    noise = rng.normal(0, 0.01, len(returns))
+    for t in range(2, len(returns)):
+        returns[t] = 0.5 * returns[t - 1] - 0.3 * returns[t - 2] + noise[t]
+    prices = {'AAA': pd.Series(100 * np.exp(np.cumsum(returns)))}
+    dataset = WindowDataset.build(prices, str(tmp_path), 2, dtype=np.float64)
+
+    model = WindowRegression(2).fit(dataset)
+    np.testing.assert_allclose(model.coef, [-0.3, 0.5], atol=0.03)
+    assert model.predict(dataset.latest()).shape == (1,)
+
+
+def test_regression_needs_data():
+    with pytest.raises(ValueError):
+        WindowRegression(3).solve()
+    with pytest.raises(ValueError):
+        WindowRegression(3).predict(np.zeros(3))
@@ -0,0 +1,38 @@
+import os
+import subprocess
+import sys
+from utils.bench import ENTRY_POINT_MODULES, HEAVY_MODULES, entry_point_imports
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def loaded_after(statement: str) -> list:
+    """
+    Runs `statement` in a fresh interpreter and returns the heavy modules it left in sys.modules.
+    """
+    probe = f"import sys\n{statement}\nprint(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    out = subprocess.run([sys.executable, '-c', probe], capture_output=True, text=True, check=True, cwd=ROOT).stdout.strip()
+    return out.split(',') if out else []
+
+
+def test_import_modules_is_lazy():
+    assert loaded_after('import modules') == []
+
+
+def test_subpackages_load_on_access():
+    assert 'pandas' in loaded_after('import modules; modules.indicators')
+
+
+def test_dataset_does_not_load_the_arima_model():
+    assert loaded_after('from modules import WindowDataset') == ['pandas']
+    assert loaded_after('from modules.ml import WindowRegression') == ['pandas']
+
+
+def test_hash_ring_does_not_load_the_runtime():
+    assert loaded_after('from modules import HashRing') == []
+    assert loaded_after('from modules.runtime import HashRing') == []
+
+
+def test_entry_point_loads_only_what_it_needs():
+    assert set(loaded_after(entry_point_imports())) <= set(ENTRY_POINT_MODULES)
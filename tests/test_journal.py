@@ -0,0 +1,86 @@
+import json
+import logging
+import os
+import time
+from modules.data.journal import Journal
+from utils.log import setup_logging
+
+
+def write(journal: Journal, records: list) -> None:
+    journal.start()
+    for kind, symbol, ts in records:
+        journal.record(kind, symbol=symbol, ts=ts)
+    journal.stop()
+
+
+def test_rotates_past_max_bytes(tmp_path):
+    journal = Journal(str(tmp_path), max_bytes=200, batch_size=4)
+    write(journal, [('signal', 'AAA', 1000.0 + i) for i in range(40)])
+
+    files = journal.files()
+    assert len(files) > 1
+    assert all(os.path.getsize(f) < 200 + 4 * 60 for f in files)
+    # Files are named after their first record, and replay reads them back in order.
+    assert [r['ts'] for r in journal.replay()] == [1000.0 + i for i in range(40)]
+
+
+def test_replay_filters(tmp_path):
+    journal = Journal(str(tmp_path), max_bytes=100, batch_size=2)
+    records = [
+        ('signal', 'AAA', 10.0),
+        ('order', 'AAA', 11.0),
+        ('signal', 'BBB', 12.0),
+        ('order', 'BBB', 13.0),
+        ('signal', 'AAA', 14.0),
+    ]
+    write(journal, records)
+
+    def replay(**filters):
+        return [(r['kind'], r['symbol'], r['ts']) for r in journal.replay(**filters)]
+
+    assert replay() == records
+    assert replay(kind='signal') == [r for r in records if r[0] == 'signal']
+    assert replay(symbol='BBB') == [r for r in records if r[1] == 'BBB']
+    assert replay(kind='order', symbol='AAA') == [('order', 'AAA', 11.0)]
+    assert replay(since=12.0) == records[2:]
+    assert replay(until=12.0) == records[:2]
+    assert replay(since=11.0, until=14.0, kind='signal') == [('signal', 'BBB', 12.0)]
+
+
+def test_failed_write_is_counted_and_writer_keeps_running(tmp_path):
+    journal = Journal(str(tmp_path / 'journal'), flush_interval=0.01).start()
+    os.rmdir(journal.directory)
+    # Occupy the directory's path with a file, so opening a journal file fails.
+    open(journal.directory, 'w').close()
+    journal.record('signal', symbol='AAA', ts=1.0)
+    deadline = time.monotonic() + 5
+    while journal.dropped == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    os.unlink(journal.directory)
+    os.makedirs(journal.directory)
+    journal.record('signal', symbol='BBB', ts=2.0)
+    journal.stop()
+
+    assert journal.dropped == 1
+    assert [r['symbol'] for r in journal.replay()] == ['BBB']
+
+
+def test_json_log_keeps_traceback_separate(tmp_path):
+    path = str(tmp_path / 'bot.log')
+    root = logging.getLogger()
+    handlers, level = root.handlers[:], root.level
+    listener = setup_logging(path=path)
+    try:
+        try:
+            1 / 0
+        except ZeroDivisionError:
+            logging.getLogger('test').exception("failed for %s", 'AAA', extra={'symbol': 'AAA'})
+    finally:
+        listener.stop()
+        root.handlers[:], root.level = handlers, level
+
+    with open(path) as f:
+        entry = json.loads(f.readline())
+    assert entry['msg'] == 'failed for AAA'
+    assert entry['symbol'] == 'AAA'
+    assert entry['exc'].splitlines()[-1] == 'ZeroDivisionError: division by zero'
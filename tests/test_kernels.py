@@ -0,0 +1,149 @@
+import numpy as np
+import pandas as pd
+import pytest
+from modules.indicators import kernels, Bollinger, EMA, OBV, RSI, SMA
+
+
+@pytest.fixture(params=kernels.available_backends())
+def backend(request):
+    previous = kernels.get_backend()
+    kernels.set_backend(request.param)
+    yield request.param
+    kernels.set_backend(previous)
+
+
+def prices(n: int = 2000, gaps: bool = False, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    if gaps:
+        close[rng.integers(0, n, n // 50)] = np.nan
+        close[100:130] = np.nan
+    return close
+
+
+def volumes(n: int = 2000) -> np.ndarray:
+    return np.random.default_rng(1).integers(1, 10_000, n)
+
+
+# Each kernel against the pandas expression it replaces.
+CASES = {
+    'rolling_mean': (lambda x: kernels.rolling_mean(x, 20), lambda s: s.rolling(20).mean()),
+    'rolling_std': (lambda x: kernels.rolling_std(x, 20), lambda s: s.rolling(20).std()),
+    'ewm_mean': (lambda x: kernels.ewm_mean(x, 2 / 15), lambda s: s.ewm(span=14, adjust=False).mean()),
+    'wilder': (lambda x: kernels.wilder(x, 14), lambda s: s.ewm(alpha=1 / 14, adjust=False).mean()),
+}
+
+
+def assert_matches(actual, expected):
+    # pandas' online rolling std drifts by up to ~1e-7 relative; the kernels are closer to exact.
+    np.testing.assert_allclose(actual, expected, rtol=1e-6, atol=1e-9, equal_nan=True)
+
+
+@pytest.mark.parametrize('name', CASES)
+@pytest.mark.parametrize('gaps', [False, True])
+def test_matches_pandas(backend, name, gaps):
+    kernel, reference = CASES[name]
+    x = prices(gaps=gaps)
+    assert_matches(kernel(x), reference(pd.Series(x)).to_numpy())
+
+
+@pytest.mark.parametrize('gaps', [False, True])
+def test_obv_matches_pandas(backend, gaps):
+    close, volume = prices(gaps=gaps), volumes()
+    series = pd.Series(close)
+    expected = np.where(series > series.shift(1), volume, np.where(series < series.shift(1), -volume, 0)).cumsum()
+    result = kernels.obv(close, volume)
+    np.testing.assert_array_equal(result, expected)
+    assert result.dtype == volume.dtype
+
+
+@pytest.mark.parametrize('name', CASES)
+def test_shorter_than_window(backend, name):
+    kernel, reference = CASES[name]
+    x = prices(10)
+    assert_matches(kernel(x), reference(pd.Series(x)).to_numpy())
+
+
+def test_window_of_one(backend):
+    x = prices(50, gaps=True)
+    assert_matches(kernels.rolling_mean(x, 1), x)
+    assert np.isnan(kernels.rolling_std(x, 1)).all()
+
+
+@pytest.mark.parametrize('name', CASES)
+def test_empty(backend, name):
+    kernel, _ = CASES[name]
+    assert len(kernel(np.array([]))) == 0
+
+
+def test_obv_empty(backend):
+    assert len(kernels.obv(np.array([]), np.array([], dtype=np.int64))) == 0
+
+
+def test_writes_into_out(backend):
+    x = prices(100)
+    out = np.empty(100)
+    assert kernels.rolling_mean(x, 20, out=out) is out
+    assert_matches(out, pd.Series(x).rolling(20).mean().to_numpy())
+
+
+@pytest.mark.parametrize('kernel', [
+    lambda x, out: kernels.rolling_mean(x, 20, out=out),
+    lambda x, out: kernels.rolling_std(x, 20, out=out),
+    lambda x, out: kernels.ewm_mean(x, 0.1, out=out),
+    lambda x, out: kernels.wilder(x, 14, out=out),
+    lambda x, out: kernels.obv(x, volumes(len(x)), out=out),
+])
+def test_out_of_wrong_length(backend, kernel):
+    with pytest.raises(ValueError):
+        kernel(prices(100), np.empty(99))
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        kernels.set_backend('fortran')
+
+
+def frame(n: int = 500) -> pd.DataFrame:
+    close = prices(n)
+    return pd.DataFrame({'Close': close, 'close': close, 'Volume': volumes(n)})
+
+
+# Indicators against the pandas code they ran before kernels were introduced.
+
+def test_sma(backend):
+    data = frame()
+    expected = data['Close'].rolling(window=14).mean()
+    assert_matches(SMA(data, 14).calculate()['SMA_14'], expected)
+
+
+def test_ema(backend):
+    data = frame()
+    expected = data['Close'].ewm(span=14, adjust=False).mean()
+    assert_matches(EMA(data, 14).calculate()['EMA_14'], expected)
+
+
+def test_bollinger(backend):
+    data = frame()
+    middle = data['Close'].rolling(window=20).mean()
+    width = data['Close'].rolling(window=20).std() * 2
+    result = Bollinger(data.copy(), 20, 2).calculate()
+    assert_matches(result['Middle Band'], middle)
+    assert_matches(result['Upper Band'], middle + width)
+    assert_matches(result['Lower Band'], middle - width)
+
+
+def test_obv(backend):
+    data = frame()
+    close, volume = data['Close'], data['Volume']
+    expected = np.where(close > close.shift(1), volume, np.where(close < close.shift(1), -volume, 0)).cumsum()
+    np.testing.assert_array_equal(OBV(data).calculate()['OBV'], expected)
+
+
+def test_rsi(backend):
+    data = frame()
+    df = data[:14].copy()
+    avg_gain = df['close'].diff().where(df['close'].diff() > 0, 0).mean()
+    avg_loss = df['close'].diff().where(df['close'].diff() < 0, 0).mean()
+    expected = 100 - (100 / (1 + avg_gain / abs(avg_loss)))
+    assert RSI(data, 14).calculate() == pytest.approx(expected, rel=1e-12)
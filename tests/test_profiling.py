@@ -0,0 +1,127 @@
+import asyncio
+import json
+import pytest
+from utils import profiling
+from utils.profiling import BUCKETS, Histogram
+
+
+@pytest.fixture
+def enabled():
+    was_enabled = profiling.is_enabled()
+    profiling.reset()
+    profiling.enable()
+    yield
+    profiling.reset()
+    if not was_enabled:
+        profiling.disable()
+
+
+@pytest.fixture
+def disabled():
+    was_enabled = profiling.is_enabled()
+    profiling.reset()
+    profiling.disable()
+    yield
+    profiling.reset()
+    if was_enabled:
+        profiling.enable()
+
+
+def test_histogram_quantiles():
+    histogram = Histogram()
+    assert histogram.quantile(0.5) == 0.0
+    for _ in range(90):
+        histogram.record(1.5e-6)
+    for _ in range(10):
+        histogram.record(0.01)
+
+    # Quantiles are the upper bound of the bucket they fall in.
+    assert histogram.quantile(0.5) == BUCKETS[1] == 2e-6
+    assert histogram.quantile(0.9) == 2e-6
+    assert histogram.quantile(0.99) == pytest.approx(0.016384)
+    assert histogram.max == 0.01
+
+
+def test_histogram_beyond_the_last_bucket():
+    histogram = Histogram()
+    histogram.record(100.0)
+    assert histogram.quantile(0.5) == 100.0
+    assert histogram.to_dict()['buckets'] == {'inf': 1}
+
+
+def test_histogram_to_dict():
+    histogram = Histogram()
+    histogram.record(1e-6)
+    histogram.record(3e-6)
+    summary = histogram.to_dict()
+    assert summary['count'] == 2
+    assert summary['mean'] == pytest.approx(2e-6)
+    assert summary['max'] == 3e-6
+    assert summary['buckets'] == {'1e-06': 1, '4e-06': 1}
+    assert Histogram().to_dict()['mean'] == 0.0
+
+
+def test_timed_sync_and_async(enabled):
+    @profiling.timed
+    def add(a, b):
+        return a + b
+
+    @profiling.timed(name='sleep')
+    async def sleep():
+        await asyncio.sleep(0.01)
+        return 'done'
+
+    assert add(1, 2) == 3
+    assert asyncio.run(sleep()) == 'done'
+    histograms = profiling.stats()['histograms']
+    assert histograms[add.__qualname__]['count'] == 1
+    assert histograms['sleep']['count'] == 1
+    assert histograms['sleep']['max'] >= 0.01
+
+
+def test_timed_records_failed_calls(enabled):
+    @profiling.timed(name='fails')
+    def fails():
+        raise ValueError
+
+    with pytest.raises(ValueError):
+        fails()
+    assert profiling.stats()['histograms']['fails']['count'] == 1
+
+
+def test_disabled_records_nothing(disabled):
+    @profiling.timed(name='add')
+    def add(a, b):
+        return a + b
+
+    assert add(1, 2) == 3
+    with profiling.timer('block'):
+        pass
+    profiling.count('orders')
+    stats = profiling.stats()
+    assert stats['histograms'] == {}
+    assert stats['counters'] == {}
+
+
+def test_count_and_timer(enabled):
+    profiling.count('orders')
+    profiling.count('orders', 2)
+    with profiling.timer('block'):
+        pass
+    stats = profiling.stats()
+    assert stats['counters'] == {'orders': 3}
+    assert stats['histograms']['block']['count'] == 1
+
+
+def test_export_includes_other_processes(enabled, tmp_path):
+    profiling.count('orders')
+    profiling.report('shard-0', {'counters': {'broker.fetches': 4}})
+    profiling.report('shard-0', {'counters': {'broker.fetches': 5}})
+    path = tmp_path / 'reports' / 'latency.json'
+    profiling.export(str(path))
+
+    exported = json.loads(path.read_text())
+    assert exported['counters'] == {'orders': 1}
+    # The latest report of each process replaces its previous one.
+    assert exported['processes'] == {'shard-0': {'counters': {'broker.fetches': 5}}}
+    assert list(path.parent.iterdir()) == [path]
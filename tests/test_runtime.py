@@ -0,0 +1,205 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import re
+import signal
+import pandas as pd
+import pytest
+from aiopubsub import Key
+from modules.broker.broker import Broker
+from modules.data.journal import Journal
+from modules.runtime.coordinator import Coordinator
+from modules.runtime.ring import HashRing
+from modules.runtime.worker import ShardWorker, _CoordinatorJournal
+from utils import profiling
+
+
+SYMBOLS = [f'SYM{i}' for i in range(2000)]
+
+
+class AlwaysBuy:
+    """
+    Strategy stand-in whose CIV is always above the broker's risk threshold.
+    """
+    def __init__(self, data, symbol: str = None, config: dict = None, journal=None):
+        self.symbol = symbol
+
+    def update(self, data) -> None:
+        pass
+
+    def get_civ(self) -> dict:
+        return {'BUY': 1.0, 'HOLD': 0.0, 'SELL': 0.0}
+
+    def get_state(self) -> dict:
+        return {}
+
+    def set_state(self, state: dict) -> None:
+        pass
+
+
+def owners(ring: HashRing) -> dict:
+    return {symbol: ring.node_for(symbol) for symbol in SYMBOLS}
+
+
+@pytest.mark.parametrize('shards', [1, 4, 8])
+def test_adding_a_shard_moves_only_its_share(shards):
+    ring = HashRing(range(shards))
+    before = owners(ring)
+    ring.add(shards)
+    after = owners(ring)
+
+    moved = [s for s in SYMBOLS if before[s] != after[s]]
+    # Every moved symbol goes to the new shard, and only about 1 / (N + 1) of them move.
+    assert all(after[s] == shards for s in moved)
+    assert len(moved) == sum(1 for s in SYMBOLS if after[s] == shards)
+    assert len(moved) < 2 * len(SYMBOLS) / (shards + 1)
+
+
+@pytest.mark.parametrize('shards', [2, 4, 8])
+def test_removing_a_shard_moves_only_its_symbols(shards):
+    ring = HashRing(range(shards))
+    before = owners(ring)
+    ring.remove(0)
+    after = owners(ring)
+
+    moved = {s for s in SYMBOLS if before[s] != after[s]}
+    assert moved == {s for s in SYMBOLS if before[s] == 0}
+
+
+def test_assignment_covers_every_symbol_once():
+    ring = HashRing(range(4))
+    assignment = ring.assign(SYMBOLS)
+    assert sorted(s for symbols in assignment.values() for s in symbols) == sorted(SYMBOLS)
+    # 64 points per shard keep the spread within a factor of two of even.
+    assert all(len(SYMBOLS) / 8 < len(symbols) < len(SYMBOLS) / 2 for symbols in assignment.values())
+
+
+def test_same_owner_across_rings():
+    # Ownership must not depend on the process, or the coordinator and workers would disagree.
+    assert owners(HashRing(range(4))) == owners(HashRing([3, 1, 0, 2]))
+
+
+def test_empty_ring():
+    with pytest.raises(ValueError):
+        HashRing().node_for('SYM0')
+
+
+def test_worker_signals_and_stats_reach_the_coordinator(tmp_path):
+    parent, child = multiprocessing.Pipe()
+    _CoordinatorJournal(child).record('signal', symbol='AAA', rule='breakout')
+    child.send(('stats', 3, {'counters': {'broker.fetches': 2}}))
+
+    journal = Journal(str(tmp_path)).start()
+    coordinator = Coordinator('http://localhost', [], workers=1, journal=journal)
+    try:
+        while parent.poll():
+            coordinator._handle(3, parent.recv())
+        assert profiling.stats()['processes']['shard-3']['counters'] == {'broker.fetches': 2}
+    finally:
+        journal.stop()
+        profiling.reset()
+    assert [(r['kind'], r['symbol'], r['rule']) for r in journal.replay()] == [('signal', 'AAA', 'breakout')]
+
+
+def test_worker_forwards_civs_without_placing_orders(monkeypatch):
+    orders = []
+
+    async def update_all(broker, symbols):
+        for symbol in symbols:
+            broker.publisher.publish(Key('data_update', symbol), pd.DataFrame({'Close': [1.0, 2.0]}))
+
+    async def place_order(broker, order):
+        orders.append(order)
+
+    monkeypatch.setattr(Broker, 'update_all', update_all)
+    monkeypatch.setattr(Broker, 'place_order', place_order)
+    parent, child = multiprocessing.Pipe()
+    worker = ShardWorker(0, child, 'http://localhost', interval=0.01, strategy_factory=AlwaysBuy)
+
+    async def main():
+        task = asyncio.create_task(worker.run())
+        parent.send(('assign', ['AAA']))
+        while not parent.poll():
+            await asyncio.sleep(0.01)
+        message = parent.recv()
+        # Give a local order, if one were placed, time to go through.
+        await asyncio.sleep(0.05)
+        parent.send(('stop',))
+        await task
+        return message
+
+    assert asyncio.run(main()) == ('civ', 0, {'BUY': 1.0, 'HOLD': 0.0, 'SELL': 0.0, 'symbol': 'AAA'})
+    assert orders == []
+
+
+class Assignments(logging.Handler):
+    """
+    Collects the (shard, number of symbols) each worker logs when it is assigned symbols.
+    """
+    def __init__(self):
+        super().__init__()
+        self.received = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        # Forwarded records arrive with their message already formatted.
+        match = re.fullmatch(r'Shard (\d+) assigned (\d+) symbols', record.getMessage())
+        if match:
+            self.received.append((int(match[1]), int(match[2]), record.process))
+
+
+async def wait_for(predicate, timeout: float = 30.0) -> None:
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        assert asyncio.get_running_loop().time() < deadline, 'timed out'
+        await asyncio.sleep(0.05)
+
+
+def test_coordinator_resizes_and_respawns_workers(tmp_path):
+    symbols = SYMBOLS[:40]
+    assignments = Assignments()
+    worker_logger = logging.getLogger('modules.runtime.worker')
+    root = logging.getLogger()
+    level = root.level
+    root.setLevel(logging.INFO)
+    worker_logger.addHandler(assignments)
+
+    def received(shard: int, process: multiprocessing.Process) -> bool:
+        # The worker running in `process` was sent all of the shard's current symbols.
+        return (shard, len(coordinator.assignment[shard]), process.pid) in assignments.received
+
+    async def main():
+        task = asyncio.create_task(coordinator.run())
+        await wait_for(lambda: len(coordinator.processes) == 2 and all(
+            received(shard, process) for shard, process in coordinator.processes.items()))
+
+        await coordinator.resize(3)
+        assert sorted(s for shard in coordinator.assignment.values() for s in shard) == sorted(symbols)
+        await wait_for(lambda: all(received(shard, process) for shard, process in coordinator.processes.items()))
+
+        removed = coordinator.processes[2]
+        await coordinator.resize(2)
+        assert removed.exitcode is not None
+        assert sorted(coordinator.processes) == [0, 1]
+        assert sorted(s for shard in coordinator.assignment.values() for s in shard) == sorted(symbols)
+        await wait_for(lambda: all(received(shard, process) for shard, process in coordinator.processes.items()))
+
+        killed = coordinator.processes[0]
+        symbols_before = sorted(coordinator.assignment[0])
+        os.kill(killed.pid, signal.SIGKILL)
+        await wait_for(lambda: 0 in coordinator.processes and coordinator.processes[0] is not killed)
+        await wait_for(lambda: received(0, coordinator.processes[0]))
+        assert sorted(coordinator.assignment[0]) == symbols_before
+
+        await coordinator.close()
+        await task
+        assert not coordinator.processes
+
+    coordinator = Coordinator(
+        'http://127.0.0.1:9', symbols, workers=2, interval=60.0, strategy_factory=AlwaysBuy,
+        snapshot_dir=str(tmp_path), respawn_delay=0.05)
+    try:
+        asyncio.run(main())
+    finally:
+        worker_logger.removeHandler(assignments)
+        root.setLevel(level)
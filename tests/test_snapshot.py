@@ -0,0 +1,73 @@
+import asyncio
+import os
+import pickle
+import numpy as np
+import pandas as pd
+from aiopubsub import Hub
+from modules.bots.trader import Trader
+from modules.data.snapshot import SnapshotStore
+
+
+def frame(n: int = 100, seed: int = 0) -> pd.DataFrame:
+    close = 100 * np.exp(np.cumsum(np.random.default_rng(seed).normal(0, 0.01, n)))
+    return pd.DataFrame({'Close': close, 'Volume': np.arange(n)})
+
+
+def test_round_trip(tmp_path):
+    store = SnapshotStore(str(tmp_path / 'nested' / 'state.pkl'))
+    state = {'broker': {'portfolio': {'AAA': 10}}, 'trader': {'strategies': {'AAA': {'data': frame()}}}}
+    store.save(state)
+
+    loaded = store.load()
+    assert loaded['broker']['portfolio'] == {'AAA': 10}
+    pd.testing.assert_frame_equal(loaded['trader']['strategies']['AAA']['data'], frame())
+    # The temporary file was renamed over the snapshot, not left behind.
+    assert os.listdir(tmp_path / 'nested') == ['state.pkl']
+
+
+def test_missing_or_unreadable_snapshot_is_empty(tmp_path):
+    path = tmp_path / 'state.pkl'
+    assert SnapshotStore(str(path)).load() == {}
+    path.write_bytes(b'\x80\x05truncated')
+    assert SnapshotStore(str(path)).load() == {}
+
+
+class Corrupt:
+    """
+    Pickles fine, but fails while being rebuilt, like a frame pickled while another thread changed it.
+    """
+    def __reduce__(self):
+        return int, ('not a number',)
+
+
+def test_snapshot_that_fails_to_rebuild_is_empty(tmp_path):
+    path = tmp_path / 'state.pkl'
+    path.write_bytes(pickle.dumps({'trader': Corrupt()}))
+    assert SnapshotStore(str(path)).load() == {}
+
+
+def test_trader_restores_strategies_from_snapshot(tmp_path):
+    store = SnapshotStore(str(tmp_path / 'state.pkl'))
+
+    async def first_run():
+        trader = Trader('http://localhost', Hub())
+        await trader.evaluate('AAA', frame())
+        trader.strategies['AAA'].position = 101.0
+        store.save({'trader': trader.get_state()})
+        await trader.close()
+
+    async def second_run():
+        trader = Trader('http://localhost', Hub())
+        trader.set_state(store.load()['trader'])
+        civ = await trader.evaluate('AAA', frame(seed=1))
+        await trader.close()
+        return trader, civ
+
+    asyncio.run(first_run())
+    trader, civ = asyncio.run(second_run())
+    strategy = trader.strategies['AAA']
+    assert civ['symbol'] == 'AAA'
+    assert strategy.position == 101.0
+    # The restored indicator reads the new window, not the one it was saved with.
+    assert strategy.bollinger.data is strategy.data
+    assert strategy.data['Close'].iloc[0] == frame(seed=1)['Close'].iloc[0]
@@ -0,0 +1,93 @@
+import asyncio
+import threading
+from modules.bots.supervisor import Supervisor
+from modules.data.snapshot import SnapshotStore
+
+
+class Counter:
+    """
+    A component that counts its ticks and keeps the count in its state.
+    """
+    def __init__(self, fail_after: int = None):
+        self.ticks = 0
+        self.fail_after = fail_after
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(0.001)
+            self.ticks += 1
+            if self.fail_after is not None and self.ticks >= self.fail_after:
+                raise RuntimeError('tick failed')
+
+    def get_state(self) -> dict:
+        return {'ticks': self.ticks}
+
+    def set_state(self, state: dict) -> None:
+        self.ticks = state['ticks']
+
+
+def run_for(supervisor: Supervisor, seconds: float) -> None:
+    async def main():
+        task = asyncio.create_task(supervisor.run())
+        await asyncio.sleep(seconds)
+        assert not task.done(), task.exception()
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+    asyncio.run(main())
+
+
+def test_failed_factory_is_retried_without_stopping_siblings(tmp_path):
+    builds = []
+
+    def flaky():
+        builds.append(None)
+        if len(builds) == 2:
+            raise RuntimeError('constructor failed')
+        return Counter(fail_after=5 if len(builds) == 1 else None)
+
+    supervisor = Supervisor(SnapshotStore(str(tmp_path / 'state.pkl')), restart_delay=0.01)
+    supervisor.add('healthy', Counter)
+    supervisor.add('flaky', flaky)
+    run_for(supervisor, 0.3)
+
+    assert len(builds) == 3
+    assert supervisor.get('healthy').ticks > 5
+    # The third build resumed from the state captured when the first instance failed.
+    assert supervisor.get('flaky').ticks > 5
+
+
+def test_rejected_state_starts_cold(tmp_path):
+    store = SnapshotStore(str(tmp_path / 'state.pkl'))
+    store.save({'counter': {'unexpected': True}})
+    supervisor = Supervisor(store, restart_delay=0.01)
+    supervisor.add('counter', Counter)
+    run_for(supervisor, 0.05)
+
+    assert supervisor.get('counter').ticks > 0
+    assert store.load()['counter']['ticks'] > 0
+
+
+class ThreadRecorder:
+    """
+    Records the threads it is pickled on.
+    """
+    def __init__(self):
+        self.threads = set()
+
+    def __getstate__(self):
+        self.threads.add(threading.current_thread())
+        return {}
+
+
+def test_periodic_snapshot_is_pickled_on_the_loop(tmp_path):
+    recorder = ThreadRecorder()
+
+    class Component(Counter):
+        def get_state(self) -> dict:
+            return {'ticks': self.ticks, 'recorder': recorder}
+
+    supervisor = Supervisor(SnapshotStore(str(tmp_path / 'state.pkl')), snapshot_interval=0.01)
+    supervisor.add('component', Component)
+    run_for(supervisor, 0.1)
+
+    assert recorder.threads == {threading.main_thread()}
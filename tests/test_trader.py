@@ -0,0 +1,85 @@
+import asyncio
+import numpy as np
+import pandas as pd
+from aiopubsub import Hub, Key, Publisher, Subscriber
+from modules.bots.trader import Trader
+from modules.strategy.base.bollingerStrategy import BollingerStrategy
+
+
+def frame(n: int = 100, seed: int = 0) -> pd.DataFrame:
+    close = 100 * np.exp(np.cumsum(np.random.default_rng(seed).normal(0, 0.01, n)))
+    return pd.DataFrame({'Close': close, 'Volume': np.arange(n)})
+
+
+def test_failed_update_does_not_stop_the_trader():
+    builds = []
+
+    def flaky(*args, **kwargs):
+        builds.append(None)
+        if len(builds) == 1:
+            raise RuntimeError('strategy failed')
+        return BollingerStrategy(*args, **kwargs)
+
+    async def main():
+        hub = Hub()
+        civs = []
+        subscriber = Subscriber(hub, 'test')
+        subscriber.add_sync_listener(Key('trading', 'civ_update'), lambda key, civ: civs.append(civ))
+        trader = Trader('http://localhost', hub, flaky)
+        publisher = Publisher(hub, prefix=Key('trading'))
+        for seed in range(3):
+            publisher.publish(Key('data_update', 'AAA'), frame(seed=seed))
+            await asyncio.sleep(0.05)
+        await trader.close()
+        await subscriber.remove_all_listeners()
+        return civs
+
+    civs = asyncio.run(main())
+    assert len(builds) == 2
+    assert [civ['symbol'] for civ in civs] == ['AAA', 'AAA']
+
+
+class FlakyModel:
+    """
+    Model stand-in whose first fit fails, as on a window too short to fit.
+    """
+    fits = 0
+
+    def fit(self, close):
+        FlakyModel.fits += 1
+        if FlakyModel.fits == 1:
+            raise ValueError('window too short')
+        return self
+
+    def forecast_volatility(self):
+        return [0.02]
+
+    def get_state(self) -> dict:
+        return {}
+
+    def set_state(self, state: dict) -> None:
+        pass
+
+
+def evaluate_three_times(**kwargs) -> list:
+    FlakyModel.fits = 0
+
+    async def main():
+        trader = Trader('http://localhost', Hub(), model_factory=FlakyModel, **kwargs)
+        civs = [await trader.evaluate('AAA', frame(seed=seed)) for seed in range(3)]
+        await trader.close()
+        return civs
+
+    return asyncio.run(main())
+
+
+def test_failed_fit_is_retried():
+    civs = evaluate_three_times(fit_retry_delay=0.0)
+    assert ['volatility' in civ for civ in civs] == [False, True, True]
+    assert FlakyModel.fits == 2
+
+
+def test_failed_fit_waits_for_the_retry_delay():
+    civs = evaluate_three_times(fit_retry_delay=60.0)
+    assert not any('volatility' in civ for civ in civs)
+    assert FlakyModel.fits == 1
@@ -0,0 +1,307 @@
+"""
+Small benchmarks for the bot. Each one exits non-zero when it misses its budget,
+so they can be run by hand or from CI.
+
+    python -m utils.bench imports --budget 1.0
+    python -m utils.bench kernels --size 100000
+    python -m utils.bench dataset --symbols 50 --steps 100000
+    python -m utils.bench runtime --symbols 64 --max-workers 4
+"""
+import argparse
+import ast
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+
+# Modules that must never be loaded by a bare `import modules`.
+HEAVY_MODULES = ('pandas', 'statsmodels', 'arch', 'aiohttp')
+
+# Heavy modules the entry point needs at start-up: the broker fetches with aiohttp and strategies work
+# on pandas frames. Together they take about 0.5 s to import; anything else, such as statsmodels and arch
+# (another 1.5 s), must wait until it is used.
+ENTRY_POINT_MODULES = ('pandas', 'aiohttp')
+
+ENTRY_POINT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'main.py')
+
+_IMPORT_PROBE = """
+import sys, time
+start = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - start
+leaked = [m for m in {heavy!r} if m in sys.modules]
+print(elapsed, ','.join(leaked))
+"""
+
+
+def entry_point_imports(path: str = ENTRY_POINT) -> str:
+    """
+    Returns the package imports an entry point script starts with, e.g. main.py's
+    `from modules import Broker, ...`, so the benchmark follows the script as it changes.
+    """
+    with open(path) as f:
+        tree = ast.parse(f.read(), path)
+    statements = [
+        ast.unparse(node) for node in tree.body
+        if isinstance(node, ast.ImportFrom) and (node.module or '').split('.')[0] in ('modules', 'utils')
+    ]
+    return '\n'.join(statements)
+
+
+def import_time(statement: str = 'import modules', repeat: int = 5) -> tuple:
+    """
+    Measures the cold time of an import statement in fresh interpreters.
+
+    @param statement: The import statement(s) to run.
+    @param repeat: Number of fresh interpreters to run. The fastest run is reported,
+    as it is the least affected by scheduler noise.
+    @return: A tuple of (seconds, heavy modules that were pulled in by the import).
+    """
+    best, leaked = float('inf'), []
+    probe = _IMPORT_PROBE.format(statement=statement, heavy=HEAVY_MODULES)
+    for _ in range(repeat):
+        out = subprocess.run(
+            [sys.executable, '-c', probe],
+            capture_output=True, text=True, check=True
+        ).stdout.split()
+        best = min(best, float(out[0]))
+        leaked = out[1].split(',') if len(out) > 1 else []
+    return best, leaked
+
+
+def bench_imports(args) -> int:
+    """
+    Checks that a bare `import modules` stays free of heavy dependencies, then times the
+    imports the entry point actually makes against the budget, and checks they load no heavy
+    modules beyond ENTRY_POINT_MODULES.
+    """
+    failed = False
+    elapsed, leaked = import_time('import modules', args.repeat)
+    print(f"import modules: {elapsed * 1000:.1f} ms")
+    if leaked:
+        print(f"FAIL: eagerly imported {', '.join(leaked)}")
+        failed = True
+
+    statement = entry_point_imports(args.entry_point)
+    elapsed, leaked = import_time(statement, args.repeat)
+    print(f"{os.path.basename(args.entry_point)} imports: {elapsed * 1000:.1f} ms (budget {args.budget * 1000:.0f} ms)")
+    print(f"    {'; '.join(statement.splitlines())}")
+    print(f"    loads {', '.join(leaked) or 'no heavy modules'}")
+    unexpected = [m for m in leaked if m not in ENTRY_POINT_MODULES]
+    if unexpected:
+        print(f"FAIL: entry point eagerly imported {', '.join(unexpected)}")
+        failed = True
+    if elapsed > args.budget:
+        print("FAIL: entry point imports over budget")
+        failed = True
+    return 1 if failed else 0
+
+
+def bench_kernels(args) -> int:
+    """
+    Checks every available indicator kernel backend against the pandas reference, then times it.
+    """
+    import numpy as np
+    from modules.indicators import kernels
+
+    rng = np.random.default_rng(0)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, args.size)))
+    gappy = close.copy()
+    gappy[rng.integers(0, args.size, args.size // 100)] = np.nan
+    volume = rng.integers(1, 10_000, args.size)
+    cases = {
+        'rolling_mean': lambda x: kernels.rolling_mean(x, 20),
+        'rolling_std': lambda x: kernels.rolling_std(x, 20),
+        'ewm_mean': lambda x: kernels.ewm_mean(x, 2 / 15),
+        'wilder': lambda x: kernels.wilder(x, 14),
+        'obv': lambda x: kernels.obv(x, volume),
+    }
+
+    failed = False
+    previous = kernels.get_backend()
+    try:
+        kernels.set_backend('pandas')
+        expected = {(name, i): fn(x) for name, fn in cases.items() for i, x in enumerate((close, gappy))}
+        for backend in kernels.available_backends():
+            kernels.set_backend(backend)
+            for name, fn in cases.items():
+                for i, x in enumerate((close, gappy)):
+                    # pandas' rolling std is an online update that drifts by up to ~2e-7 over long series,
+                    # while the kernels stay within ~1e-9 of an exact two-pass std; allow for that drift.
+                    if not np.allclose(fn(x), expected[name, i], rtol=1e-6, atol=1e-9, equal_nan=True):
+                        print(f"FAIL: {backend}.{name} differs from pandas{' (with NaN)' if i else ''}")
+                        failed = True
+                fn(close)  # warm-up, e.g. JIT compilation
+                start = time.perf_counter()
+                for _ in range(args.repeat):
+                    fn(close)
+                elapsed = (time.perf_counter() - start) / args.repeat
+                print(f"{backend:>6} {name:<12} {elapsed * 1000:8.3f} ms  {args.size / elapsed / 1e6:8.1f} M rows/s")
+    finally:
+        kernels.set_backend(previous)
+    return 1 if failed else 0
+
+
+def bench_dataset(args) -> int:
+    """
+    Reports samples/sec for batch iteration, training and inference on a synthetic multi-symbol history.
+    """
+    import numpy as np
+    import pandas as pd
+    from modules.ml import WindowDataset, WindowRegression
+
+    rng = np.random.default_rng(0)
+    prices = {
+        f'SYM{i}': pd.Series(100 * np.exp(np.cumsum(rng.normal(0, 0.01, args.steps - rng.integers(0, args.steps // 10)))))
+        for i in range(args.symbols)
+    }
+    with tempfile.TemporaryDirectory() as path:
+        start = time.perf_counter()
+        dataset = WindowDataset.build(prices, path, args.lookback)
+        print(f"build      {time.perf_counter() - start:8.3f} s")
+        total = dataset.windows.shape[0] * len(dataset)
+
+        start = time.perf_counter()
+        for batch in dataset.batches(args.batch_size):
+            pass
+        elapsed = time.perf_counter() - start
+        print(f"iterate    {total / elapsed / 1e6:8.2f} M samples/s")
+
+        model = WindowRegression(args.lookback)
+        start = time.perf_counter()
+        model.fit(dataset, args.batch_size)
+        elapsed = time.perf_counter() - start
+        print(f"train      {total / elapsed / 1e6:8.2f} M samples/s ({model.samples} complete windows)")
+
+        start = time.perf_counter()
+        for batch in dataset.batches(args.batch_size):
+            model.predict(batch.x)
+        elapsed = time.perf_counter() - start
+        print(f"inference  {total / elapsed / 1e6:8.2f} M samples/s")
+        del dataset, batch
+    return 0
+
+
+def _runtime_shard(conn, symbols: list, rows: int, rounds: int) -> None:
+    """
+    Worker process for bench_runtime: runs a Trader over synthetic data for its symbols and sends
+    every CIV back, as a ShardWorker would, timing from the parent's go signal to the last CIV.
+    """
+    import asyncio
+    import numpy as np
+    import pandas as pd
+    from aiopubsub import Hub
+    from modules.bots.trader import Trader
+
+    rng = np.random.default_rng(len(symbols))
+    frames = {}
+    for symbol in symbols:
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, rows)))
+        frames[symbol] = pd.DataFrame({'Close': close, 'Volume': rng.integers(1, 10_000, rows)})
+
+    async def run():
+        trader = Trader('http://localhost', Hub())
+        for symbol in symbols:
+            await trader.evaluate(symbol, frames[symbol])  # warm-up: imports, first allocations
+        conn.send(('ready',))
+        conn.recv()
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for symbol in symbols:
+                conn.send(('civ', await trader.evaluate(symbol, frames[symbol])))
+        conn.send(('done', time.perf_counter() - start))
+        await trader.close()
+
+    asyncio.run(run())
+
+
+def bench_runtime(args) -> int:
+    """
+    Measures strategy updates/sec against the number of worker processes, on synthetic data.
+    """
+    import multiprocessing
+    from multiprocessing.connection import wait
+    from modules.runtime.ring import HashRing
+
+    context = multiprocessing.get_context('spawn')
+    symbols = [f'SYM{i}' for i in range(args.symbols)]
+    counts = sorted({1, *(2 ** i for i in range(1, args.max_workers.bit_length())), args.max_workers})
+    print(f"{args.symbols} symbols x {args.rounds} rounds of {args.rows} rows, {os.cpu_count()} cores")
+
+    baseline = None
+    for workers in counts:
+        assignment = HashRing(range(workers)).assign(symbols)
+        conns, processes = [], []
+        for shard in range(workers):
+            parent, child = context.Pipe()
+            process = context.Process(target=_runtime_shard, args=(child, assignment[shard], args.rows, args.rounds), daemon=True)
+            process.start()
+            child.close()
+            conns.append(parent)
+            processes.append(process)
+        for conn in conns:
+            conn.recv()
+
+        civs = 0
+        busy = set(conns)
+        start = time.perf_counter()
+        for conn in conns:
+            conn.send(('go',))
+        while busy:
+            for conn in wait(busy):
+                message = conn.recv()
+                if message[0] == 'civ':
+                    civs += 1
+                else:
+                    busy.discard(conn)
+        elapsed = time.perf_counter() - start
+        for process in processes:
+            process.join()
+
+        rate = civs / elapsed
+        baseline = baseline or rate
+        print(f"{workers:>3} workers {rate:10.0f} updates/s  x{rate / baseline:.2f}")
+    if args.min_speedup and rate / baseline < args.min_speedup:
+        print(f"FAIL: {counts[-1]} workers are x{rate / baseline:.2f} faster than one, expected x{args.min_speedup}")
+        return 1
+    return 0
+
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m utils.bench')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    imports = commands.add_parser('imports', help='cold import time of the package and the entry point')
+    imports.add_argument('--entry-point', default=ENTRY_POINT, help='script whose package imports are timed')
+    imports.add_argument('--budget', type=float, default=1.0, help='seconds')
+    imports.add_argument('--repeat', type=int, default=5)
+    imports.set_defaults(func=bench_imports)
+
+    kernel = commands.add_parser('kernels', help='indicator kernel parity and throughput per backend')
+    kernel.add_argument('--size', type=int, default=100_000)
+    kernel.add_argument('--repeat', type=int, default=10)
+    kernel.set_defaults(func=bench_kernels)
+
+    dataset = commands.add_parser('dataset', help='windowed dataset and batched model throughput')
+    dataset.add_argument('--symbols', type=int, default=50)
+    dataset.add_argument('--steps', type=int, default=100_000)
+    dataset.add_argument('--lookback', type=int, default=32)
+    dataset.add_argument('--batch-size', type=int, default=1024)
+    dataset.set_defaults(func=bench_dataset)
+
+    runtime = commands.add_parser('runtime', help='strategy throughput against the number of worker processes')
+    runtime.add_argument('--symbols', type=int, default=64)
+    runtime.add_argument('--rows', type=int, default=500, help='rows in each symbol\'s data window')
+    runtime.add_argument('--rounds', type=int, default=20)
+    runtime.add_argument('--max-workers', type=int, default=os.cpu_count() or 1)
+    runtime.add_argument('--min-speedup', type=float, default=0.0, help='required speedup of max-workers over one')
+    runtime.set_defaults(func=bench_runtime)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
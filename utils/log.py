@@ -0,0 +1,118 @@
+"""
+Queue-backed logging setup.
+
+Log calls made on the event loop only enqueue the record; formatting and I/O happen on a
+background thread owned by a QueueListener.
+
+    listener = setup_logging(path='data/reports/bot.log')
+    ...
+    listener.stop()
+
+Worker processes forward their records to the parent over a multiprocessing queue
+(`forward_logging()`), where `receive_logging()` hands them to the parent's own handlers,
+so every process ends up in the same log.
+"""
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Formats a record as a single JSON line. Values passed with `extra=` are included as fields.
+    """
+    _RESERVED = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime'}
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': record.created,
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+        }
+        entry.update({k: v for k, v in vars(record).items() if k not in self._RESERVED})
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry['exc'] = record.exc_text
+        if record.stack_info:
+            entry['stack'] = record.stack_info
+        return json.dumps(entry, separators=(',', ':'), default=str)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that keeps the traceback out of the message.
+
+    The stock prepare() formats the traceback into `msg` and clears `exc_info`, so the formatter on the
+    listener thread could never write it as a separate field. Here the traceback is rendered into
+    `exc_text` (the live traceback cannot be held on the queue) and `msg` stays the message alone.
+    """
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.msg = record.getMessage()
+        record.args = None
+        record.exc_info = None
+        return record
+
+
+def setup_logging(level: int = logging.INFO, path: str = None, max_bytes: int = 16 * 1024 * 1024, backups: int = 5) -> logging.handlers.QueueListener:
+    """
+    Routes all logging through a queue to a background writer and starts it.
+
+    @param level: Root log level.
+    @param path: Optional. A file to write JSON lines to, rotated at `max_bytes` keeping `backups` files.
+    If not set, records are written to stderr.
+    @return: The running QueueListener. Call stop() on shutdown to flush remaining records.
+    """
+    if path is None:
+        handler = logging.StreamHandler(sys.stderr)
+    else:
+        handler = logging.handlers.RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups, encoding='utf-8')
+    handler.setFormatter(JsonFormatter())
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.handlers[:] = [_QueueHandler(log_queue)]
+    root.setLevel(level)
+
+    listener = logging.handlers.QueueListener(log_queue, handler, respect_handler_level=True)
+    listener.start()
+    return listener
+
+
+class _Dispatch(logging.Handler):
+    """
+    Passes records received from another process to the logger they were logged to in this one.
+    """
+    def handle(self, record: logging.LogRecord) -> bool:
+        logging.getLogger(record.name).handle(record)
+        return True
+
+
+def forward_logging(log_queue, level: int = logging.INFO) -> None:
+    """
+    Routes all logging in a worker process to `log_queue`, for the parent to write.
+
+    @param log_queue: A multiprocessing queue read by the parent's receive_logging().
+    @param level: Root log level, normally the parent's.
+    """
+    root = logging.getLogger()
+    root.handlers[:] = [_QueueHandler(log_queue)]
+    root.setLevel(level)
+
+
+def receive_logging(log_queue) -> logging.handlers.QueueListener:
+    """
+    Starts writing records forwarded by worker processes through this process's logging setup.
+
+    @return: The running QueueListener. Call stop() once the workers have exited.
+    """
+    listener = logging.handlers.QueueListener(log_queue, _Dispatch())
+    listener.start()
+    return listener
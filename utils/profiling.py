@@ -0,0 +1,290 @@
+"""
+Lightweight instrumentation for the hot path.
+
+Timers and counters are recorded only while profiling is enabled (`enable()`, or the
+PYTRADE_PROFILE=1 environment variable). When disabled, a decorated call costs one global
+lookup and a branch on top of the call itself.
+
+    @timed
+    def calculate(self): ...
+
+    with timer('broker.parse'):
+        ...
+
+    count('broker.orders_placed')
+
+Latency histograms can be exported to a JSON file on demand (`export()`) or periodically
+(`export_periodically()`), and a sampling profiler can be started on demand, from code or
+by sending the process a signal (`install_signal_trigger()`).
+"""
+import asyncio
+import bisect
+import collections
+import functools
+import inspect
+import json
+import os
+import signal
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict
+
+
+_enabled = os.environ.get('PYTRADE_PROFILE') == '1'
+
+# Bucket upper bounds in seconds: 1us doubling up to ~16s. Anything slower lands in the last bucket.
+BUCKETS = tuple(1e-6 * 2 ** i for i in range(25))
+
+
+def enable() -> None:
+    global _enabled
+    _enabled = True
+
+
+def disable() -> None:
+    global _enabled
+    _enabled = False
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+class Histogram:
+    """
+    Fixed-bucket latency histogram. Recording is a bisect and three additions.
+    """
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q: float) -> float:
+        """
+        Returns the upper bound of the bucket holding the q-th quantile.
+        """
+        if self.count == 0:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(BUCKETS, self.counts):
+            seen += n
+            if seen >= rank:
+                return bound
+        return self.max
+
+    def to_dict(self) -> dict:
+        return {
+            'count': self.count,
+            'mean': self.total / self.count if self.count else 0.0,
+            'p50': self.quantile(0.5),
+            'p90': self.quantile(0.9),
+            'p99': self.quantile(0.99),
+            'max': self.max,
+            'buckets': {f'{bound:.3g}': n for bound, n in zip(BUCKETS + (float('inf'),), self.counts) if n},
+        }
+
+
+histograms: Dict[str, Histogram] = collections.defaultdict(Histogram)
+counters: Dict[str, int] = collections.Counter()
+# The latest stats() of other processes, e.g. shard workers, exported alongside this process's own.
+processes: Dict[str, dict] = {}
+
+
+def count(name: str, n: int = 1) -> None:
+    """
+    Increments a counter, if profiling is enabled.
+    """
+    if _enabled:
+        counters[name] += n
+
+
+@contextmanager
+def timer(name: str):
+    """
+    Times the enclosed block into the histogram `name`, if profiling is enabled.
+    """
+    if not _enabled:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        histograms[name].record(time.perf_counter() - start)
+
+
+def timed(func: Callable = None, *, name: str = None):
+    """
+    Decorator that times each call of a function or coroutine function.
+    The histogram is named after the function's qualified name unless `name` is given.
+
+    Usable bare (`@timed`) or with arguments (`@timed(name='...')`).
+    """
+    if func is None:
+        return functools.partial(timed, name=name)
+    label = name or func.__qualname__
+
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            if not _enabled:
+                return await func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                histograms[label].record(time.perf_counter() - start)
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not _enabled:
+            return func(*args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            histograms[label].record(time.perf_counter() - start)
+    return wrapper
+
+
+def stats() -> dict:
+    """
+    Returns a JSON-serialisable summary of all histograms and counters, including those reported by other processes.
+    """
+    summary = {
+        'time': time.time(),
+        'histograms': {name: h.to_dict() for name, h in sorted(histograms.items())},
+        'counters': dict(counters),
+    }
+    if processes:
+        summary['processes'] = dict(processes)
+    return summary
+
+
+def report(source: str, process_stats: dict) -> None:
+    """
+    Records the stats() of another process under `source`, replacing its previous report.
+    """
+    processes[source] = process_stats
+
+
+def reset() -> None:
+    histograms.clear()
+    counters.clear()
+    processes.clear()
+
+
+def export(path: str = 'data/reports/latency.json') -> None:
+    """
+    Writes the current stats() to `path`, replacing the previous export.
+    """
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(stats(), f, indent=2)
+    os.replace(tmp_path, path)
+
+
+async def export_periodically(path: str = 'data/reports/latency.json', interval: float = 60.0) -> None:
+    """
+    Exports the histograms every `interval` seconds until cancelled.
+    """
+    while True:
+        await asyncio.sleep(interval)
+        if _enabled:
+            export(path)
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler that samples the stack of one thread from a background thread.
+
+    Unlike cProfile it does not hook every call, so it can be left running against
+    production load. Samples are aggregated as folded stacks ("outer;inner;leaf count"),
+    the input format of flamegraph tools.
+
+    @param interval: Seconds between samples.
+    @param thread_id: The thread to sample. Defaults to the thread creating the profiler,
+    which is normally the one running the event loop.
+    """
+    def __init__(self, interval: float = 0.005, thread_id: int = None):
+        self.interval = interval
+        self.thread_id = thread_id if thread_id is not None else threading.get_ident()
+        self.samples: Dict[str, int] = collections.Counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})')
+                frame = frame.f_back
+            if stack:
+                self.samples[';'.join(reversed(stack))] += 1
+
+    def start(self) -> 'SamplingProfiler':
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._sample, name='sampling-profiler', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def write(self, path: str) -> None:
+        """
+        Writes the samples in folded-stack format, most frequent first.
+        """
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w') as f:
+            for stack, n in sorted(self.samples.items(), key=lambda item: -item[1]):
+                f.write(f'{stack} {n}\n')
+
+
+def profile_for(seconds: float, path: str = None, interval: float = 0.005, thread_id: int = None) -> threading.Thread:
+    """
+    Samples the given thread for `seconds` in the background, then writes the folded stacks to `path`.
+    Returns immediately; the returned thread finishes once the profile has been written.
+    """
+    if path is None:
+        path = time.strftime('data/reports/profile-%Y%m%d-%H%M%S.folded')
+    profiler = SamplingProfiler(interval, thread_id)
+
+    def run():
+        profiler.start()
+        time.sleep(seconds)
+        profiler.stop()
+        profiler.write(path)
+
+    thread = threading.Thread(target=run, name='profile-trigger', daemon=True)
+    thread.start()
+    return thread
+
+
+def install_signal_trigger(signum: int = getattr(signal, 'SIGUSR1', None), seconds: float = 10.0) -> None:
+    """
+    Starts a `seconds` long sampling profile of the calling thread whenever the process receives `signum`,
+    e.g. `kill -USR1 <pid>`. Must be called from the main thread. Does nothing on platforms without SIGUSR1.
+    """
+    if signum is None:
+        return
+    thread_id = threading.get_ident()
+    signal.signal(signum, lambda *_: profile_for(seconds, thread_id=thread_id))